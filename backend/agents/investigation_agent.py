@@ -1,21 +1,32 @@
 ﻿from typing import Dict, List, Any, AsyncGenerator, Optional
 import asyncio
+import time
 import uuid
 from datetime import datetime
 import json
 import os
 from dotenv import load_dotenv
 
-from models.schemas import AgentNode, NodeType, InvestigationUpdate, InvestigationResult
+from agents.investigation_store import (
+    InMemorySnapshotBackend, InvestigationStore, RedisSnapshotBackend, SQLiteSnapshotBackend, SnapshotBackend
+)
+from agents.task_graph import TaskGraph
+from models.schemas import AgentNode, NodeType, InvestigationUpdate, InvestigationResult, DateRange
 from services.stock_data_service import StockDataService
 from services.claude_ai_service import ClaudeAIService
+from services.llm_scheduler import request_priority
+from services.token_budget import current_investigation
+from services.ttl_cache import TTLCache
 
 load_dotenv()
 
+DEFAULT_SPILL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "investigations.sqlite3")
+
 class InvestigationState:
-    def __init__(self, investigation_id: str, symbol: str):
+    def __init__(self, investigation_id: str, symbol: str, date_range: Optional[DateRange] = None):
         self.investigation_id = investigation_id
         self.symbol = symbol
+        self.date_range = date_range
         self.nodes: List[AgentNode] = []
         self.current_findings: List[str] = []
         self.next_actions: List[str] = []
@@ -33,11 +44,56 @@ class InvestigationState:
         self.active_threads: List[str] = []
         self.discovered_leads: List[str] = []
         self.cross_validation_results: Dict[str, bool] = {}
+        
+        # Analyses answered ahead of time by a consolidated Claude call, keyed by analysis name
+        self.prefetched_analyses: Dict[str, Dict[str, Any]] = {}
+        
+        # Changes to existing nodes (streamed text deltas, completions) for node_updated events
+        self.node_updates: List[Dict[str, Any]] = []
 
 class InvestigationAgent:
-    def __init__(self):
-        self.investigations: Dict[str, InvestigationState] = {}
-        self.stock_service = StockDataService()
+    # Per-step time limits (seconds) for the investigation task graph
+    STEP_TIMEOUTS = {
+        "price_data": 30.0,
+        "decision": 60.0,
+        "sub_investigation": 60.0,
+        "cross_validation": 10.0,
+        "master_inference": 120.0
+    }
+    # Batch runs wait on Message Batches round trips (minutes to hours), so their steps are not time-limited
+    BATCH_STEP_TIMEOUTS = {step: None for step in STEP_TIMEOUTS}
+    # Fixed order of analysis branches, so cross-validation pairs the same branches however they finish
+    ANALYSIS_ORDER = ["news_sentiment", "market_context", "technical"]
+    # Longest a progress stream waits for an active investigation (covers every step timeout in sequence)
+    STREAM_TIMEOUT_SECONDS = sum(STEP_TIMEOUTS.values())
+    # How often live progress is published to, and polled from, the shared state backend
+    SHARED_STATE_INTERVAL = 0.25
+    # Part of the deduplication key: bump when steps or prompts change so older results are not reused
+    PIPELINE_VERSION = "1"
+    # Most request ids held in memory pointing at a shared (deduplicated) run; older ones are
+    # resolved through the spill and shared backends
+    MAX_DEDUP_ALIASES = 10000
+
+    def __init__(self, claude_service: Optional[ClaudeAIService] = None,
+                 stock_service: Optional[StockDataService] = None,
+                 investigation_store: Optional[InvestigationStore] = None,
+                 dedup: Optional[bool] = None, dedup_ttl: Optional[float] = None):
+        self.investigations = investigation_store or self._create_investigation_store()
+        
+        # Identical requests (symbol, date range, pipeline version) share one run when enabled
+        self.dedup_enabled = dedup if dedup is not None else os.getenv("INVESTIGATION_DEDUP", "false").lower() == "true"
+        self.dedup_ttl = dedup_ttl if dedup_ttl is not None else float(os.getenv("INVESTIGATION_DEDUP_TTL_SECONDS", "300"))
+        self._dedup_runs: Dict[tuple, tuple] = {}  # key -> (investigation_id, finished_at or None)
+        # Aliases live as long as finished investigations stay in memory
+        self._dedup_aliases = TTLCache(max_entries=self.MAX_DEDUP_ALIASES, ttl=self.investigations.completed_ttl)
+        self.dedup_attached = 0
+        self.dedup_reused = 0
+        self.stock_service = stock_service or StockDataService()
+        
+        if claude_service is not None:
+            self.claude_service = claude_service
+            self.use_claude = True
+            return
         
         try:
             self.claude_service = ClaudeAIService()
@@ -48,34 +104,80 @@ class InvestigationAgent:
             self.claude_service = None
             self.use_claude = False
 
+    def _create_investigation_store(self) -> InvestigationStore:
+        """Bounded store configured from the environment; set INVESTIGATION_SPILL_PATH to "" to disable spilling"""
+        ttl = float(os.getenv("INVESTIGATION_TTL_SECONDS", "3600"))
+        max_mb = os.getenv("INVESTIGATION_STORE_MAX_MB")
+        spill = None
+        # Spilled and shared results are kept a day by default
+        snapshot_ttl = float(os.getenv("INVESTIGATION_SPILL_TTL_SECONDS", "86400"))
+        spill_path = os.getenv("INVESTIGATION_SPILL_PATH", DEFAULT_SPILL_PATH)
+        if spill_path:
+            try:
+                spill = SQLiteSnapshotBackend(spill_path, ttl=snapshot_ttl)
+            except Exception as e:
+                print(f"[WARNING] Investigation spill store unavailable at {spill_path}: {e}")
+        return InvestigationStore(
+            self._snapshot_state,
+            max_entries=int(os.getenv("INVESTIGATION_STORE_MAX_ENTRIES", "1000")),
+            completed_ttl=ttl,
+            max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+            spill=spill,
+            shared=self._create_shared_state_backend(snapshot_ttl)
+        )
+
+    def _create_shared_state_backend(self, ttl: float) -> Optional[SnapshotBackend]:
+        """INVESTIGATION_STATE_BACKEND=redis shares live state across workers through REDIS_URL"""
+        backend = os.getenv("INVESTIGATION_STATE_BACKEND", "").lower()
+        if backend == "redis":
+            url = os.getenv("REDIS_URL", "redis://localhost:6379")
+            try:
+                shared = RedisSnapshotBackend(url, ttl=ttl)
+                print(f"[INFO] Sharing investigation state through Redis at {shared.url}")
+                return shared
+            except Exception as e:
+                print(f"[WARNING] Redis state backend unavailable at {url}: {e}")
+        elif backend == "memory":
+            return InMemorySnapshotBackend(ttl=ttl)
+        return None
+
     async def _fetch_comprehensive_price_data(self, state: InvestigationState) -> str:
         try:
-            stock_data = await self.stock_service.get_stock_quote(state.symbol)
-            historical_data = await self.stock_service.get_historical_data(state.symbol, 90)
-            
-            current_price = stock_data.get("current_price", 100.0)
-            
-            if historical_data and len(historical_data) > 0:
-                start_index = min(30, len(historical_data) - 1)
-                start_price = historical_data[-start_index].get("close", current_price)
-                price_change = ((current_price - start_price) / start_price) * 100
-                
-                state.start_price = start_price
-                state.end_price = current_price
-                state.price_change_percent = price_change
+            if state.date_range:
+                await self._fetch_date_range_price_data(state)
             else:
-                state.start_price = current_price * 0.95
-                state.end_price = current_price
-                state.price_change_percent = 5.26
+                stock_data = await self.stock_service.get_stock_quote(state.symbol)
+                price_series = await self.stock_service.get_price_series(state.symbol, 90)
+                
+                current_price = stock_data.get("current_price", 100.0)
+                
+                if len(price_series) > 0:
+                    # Oldest-first series: index start_index - 1 is the same bar the newest-first records had at -start_index
+                    start_index = max(min(30, len(price_series) - 1), 1)
+                    start_price = float(price_series.close[start_index - 1])
+                    price_change = ((current_price - start_price) / start_price) * 100
+                    
+                    state.start_price = start_price
+                    state.end_price = current_price
+                    state.price_change_percent = price_change
+                else:
+                    state.start_price = current_price * 0.95
+                    state.end_price = current_price
+                    state.price_change_percent = 5.26
             
             node_id = str(uuid.uuid4())
             node = AgentNode(
                 id=node_id,
                 type=NodeType.DATA_FETCH,
                 label=f"Fetch {state.symbol} Price Data",
-                description=f"Retrieved price data: {state.price_change_percent:+.2f}% change from  to ",
+                description=f"Retrieved price data: {state.price_change_percent:+.2f}% change from ${state.start_price:.2f} to ${state.end_price:.2f}",
                 status="completed",
-                data={"symbol": state.symbol, "price_change_percent": state.price_change_percent},
+                data={
+                    "symbol": state.symbol,
+                    "price_change_percent": state.price_change_percent,
+                    "start_date": state.date_range.start_date if state.date_range else None,
+                    "end_date": state.date_range.end_date if state.date_range else None
+                },
                 created_at=datetime.now().isoformat(),
                 completed_at=datetime.now().isoformat()
             )
@@ -98,6 +200,26 @@ class InvestigationAgent:
             state.nodes.append(node)
             return node_id
 
+    async def _fetch_date_range_price_data(self, state: InvestigationState):
+        """Measure the price move across the requested date range using only the bars inside it"""
+        start_date = state.date_range.start_date
+        end_date = state.date_range.end_date
+        price_series = await self.stock_service.get_price_series(
+            state.symbol, start_date=start_date, end_date=end_date
+        )
+        if len(price_series) == 0:
+            raise ValueError(f"No price data for {state.symbol} between {start_date} and {end_date}")
+        
+        state.start_price = float(price_series.close[0])
+        state.end_price = float(price_series.close[-1])
+        
+        # A range that runs up to today ends at the live quote rather than the last daily close
+        if end_date >= datetime.now().date().isoformat():
+            stock_data = await self.stock_service.get_stock_quote(state.symbol)
+            state.end_price = stock_data.get("current_price", state.end_price)
+        
+        state.price_change_percent = ((state.end_price - state.start_price) / state.start_price) * 100
+
     async def _analyze_price_movement_decision(self, state: InvestigationState, parent_node_id: str) -> str:
         try:
             investigation_hypotheses = []
@@ -111,7 +233,15 @@ class InvestigationAgent:
                         "volume": 1000000
                     }
                     
-                    claude_analysis = await self.claude_service.analyze_price_movement(stock_data, state.symbol)
+                    if self.claude_service.consolidated_mode:
+                        # One round trip answers both the price movement and the news sentiment questions
+                        bundle = await self.claude_service.analyze_investigation_bundle(
+                            state.symbol, stock_data, self._news_headlines(state), state.price_change_percent or 0
+                        )
+                        claude_analysis = bundle["price_movement"]
+                        state.prefetched_analyses["news_sentiment"] = bundle["news_sentiment"]
+                    else:
+                        claude_analysis = await self.claude_service.analyze_price_movement(stock_data, state.symbol)
                     investigation_hypotheses = claude_analysis.get("investigation_hypotheses", [])
                     parallel_investigations = claude_analysis.get("parallel_investigations", [])
                     
@@ -142,8 +272,9 @@ class InvestigationAgent:
             print(f"Error in decision analysis: {e}")
             return parent_node_id
 
-    async def _spawn_sub_investigations(self, state: InvestigationState, parent_node_id: str):
-        """Spawn sub-investigation nodes based on Claude's analysis"""
+    async def _spawn_sub_investigations(self, state: InvestigationState, parent_node_id: str,
+                                        timeout: Optional[float] = None):
+        """Spawn sub-investigation nodes based on Claude's analysis; timeout limits each branch"""
         try:
             # Get the decision data to determine what sub-investigations to spawn
             parent_node = next((node for node in state.nodes if node.id == parent_node_id), None)
@@ -152,37 +283,46 @@ class InvestigationAgent:
             
             hypotheses = parent_node.data.get("investigation_hypotheses", [])
             
-            # Create sentiment analysis node for news
-            sentiment_node_id = await self._create_sentiment_analysis_node(state, parent_node_id)
+            # The branches are independent of each other, so they all run at once
+            graph = TaskGraph(default_timeout=timeout)
             
-            # Create earnings investigation node if relevant
+            # Sentiment analysis node for news
+            graph.add("sentiment", lambda _: self._create_sentiment_analysis_node(state, parent_node_id))
+            
+            # Earnings investigation node if relevant
             if any("earnings" in h.lower() for h in hypotheses):
-                earnings_node_id = await self._create_earnings_investigation_node(state, parent_node_id)
+                graph.add("earnings", lambda _: self._create_earnings_investigation_node(state, parent_node_id))
+            
+            # Market context analysis node
+            graph.add("market", lambda _: self._create_market_context_node(state, parent_node_id))
             
-            # Create market context analysis node
-            market_node_id = await self._create_market_context_node(state, parent_node_id)
+            # Technical analysis node
+            graph.add("technical", lambda _: self._create_technical_analysis_node(state, parent_node_id))
             
-            # Create technical analysis node
-            technical_node_id = await self._create_technical_analysis_node(state, parent_node_id)
+            await graph.run()
             
         except Exception as e:
             print(f"Error spawning sub-investigations: {e}")
 
+    def _news_headlines(self, state: InvestigationState) -> List[Dict[str, str]]:
+        return [
+            {"headline": f"{state.symbol} shows strong performance in latest quarter"},
+            {"headline": f"Analysts upgrade {state.symbol} price target"},
+            {"headline": f"{state.symbol} announces new product developments"}
+        ]
+
     async def _create_sentiment_analysis_node(self, state: InvestigationState, parent_node_id: str) -> str:
         """Create sentiment analysis child node"""
         try:
             # Simulate news sentiment analysis
             if self.use_claude and self.claude_service:
                 try:
-                    # Use Claude for news sentiment analysis
-                    news_data = [
-                        {"headline": f"{state.symbol} shows strong performance in latest quarter"},
-                        {"headline": f"Analysts upgrade {state.symbol} price target"},
-                        {"headline": f"{state.symbol} announces new product developments"}
-                    ]
-                    sentiment_result = await self.claude_service.analyze_news_sentiment(
-                        state.symbol, news_data, state.price_change_percent or 0
-                    )
+                    # Use Claude for news sentiment analysis (already answered in consolidated mode)
+                    sentiment_result = state.prefetched_analyses.get("news_sentiment")
+                    if sentiment_result is None:
+                        sentiment_result = await self.claude_service.analyze_news_sentiment(
+                            state.symbol, self._news_headlines(state), state.price_change_percent or 0
+                        )
                     sentiment_summary = sentiment_result.get("overall_sentiment", "neutral")
                     impact_score = sentiment_result.get("sentiment_score", 0.5)
                 except Exception:
@@ -303,6 +443,7 @@ class InvestigationAgent:
         try:
             # Find nodes from different branches to cross-validate
             analysis_nodes = [node for node in state.nodes if node.type == NodeType.ANALYSIS]
+            analysis_nodes.sort(key=lambda node: self._analysis_rank(node.data.get("analysis_type")))
             
             if len(analysis_nodes) >= 2:
                 # Create cross-validation node that connects separate analyses
@@ -335,6 +476,11 @@ class InvestigationAgent:
         except Exception as e:
             print(f"Error in cross-validation: {e}")
 
+    def _analysis_rank(self, analysis_type: Optional[str]) -> int:
+        if analysis_type in self.ANALYSIS_ORDER:
+            return self.ANALYSIS_ORDER.index(analysis_type)
+        return len(self.ANALYSIS_ORDER)
+
     async def _create_master_inference(self, state: InvestigationState, validation_node_id: str, inference_nodes: List[str]) -> str:
         try:
             all_evidence = []
@@ -346,6 +492,24 @@ class InvestigationAgent:
             direction = "increased" if price_change > 0 else "decreased"
             magnitude = abs(price_change)
             
+            # Publish the node up front so streamed reasoning can be shown while Claude is still writing
+            node_id = str(uuid.uuid4())
+            node = AgentNode(
+                id=node_id,
+                type=NodeType.INFERENCE,
+                label=f"Master Inference: {state.symbol}",
+                description="Generating master inference...",
+                status="in_progress",
+                data={"partial_text": ""},
+                parent_id=validation_node_id,
+                created_at=datetime.now().isoformat()
+            )
+            state.nodes.append(node)
+            
+            def on_delta(text: str):
+                node.data["partial_text"] += text
+                state.node_updates.append({"node_id": node_id, "delta": text})
+            
             if self.use_claude and self.claude_service:
                 try:
                     price_data = {
@@ -357,7 +521,7 @@ class InvestigationAgent:
                     }
                     
                     claude_analysis = await self.claude_service.generate_master_inference(
-                        state.symbol, all_evidence, price_data, {}
+                        state.symbol, all_evidence, price_data, {}, on_delta=on_delta
                     )
                     
                     executive_summary = claude_analysis.get("executive_summary", f"{state.symbol} moved {price_change:.1f}%")
@@ -377,25 +541,18 @@ class InvestigationAgent:
                 detailed_explanation = f"Stock {direction} by {magnitude:.1f}%."
                 cause_confidence = 0.6
             
-            node_id = str(uuid.uuid4())
-            node = AgentNode(
-                id=node_id,
-                type=NodeType.INFERENCE,
-                label=f"Master Inference: {state.symbol}",
-                description=f"{primary_cause}: {magnitude:.1f}% {direction}",
-                status="completed",
-                data={
-                    "executive_summary": executive_summary,
-                    "detailed_reasoning": detailed_explanation,
-                    "primary_cause": primary_cause,
-                    "cause_confidence": cause_confidence
-                },
-                parent_id=validation_node_id,
-                created_at=datetime.now().isoformat(),
-                completed_at=datetime.now().isoformat()
-            )
+            node.description = f"{primary_cause}: {magnitude:.1f}% {direction}"
+            node.status = "completed"
+            node.data = {
+                "executive_summary": executive_summary,
+                "detailed_reasoning": detailed_explanation,
+                "primary_cause": primary_cause,
+                "cause_confidence": cause_confidence,
+                "streamed_text": node.data["partial_text"]
+            }
+            node.completed_at = datetime.now().isoformat()
+            state.node_updates.append({"node_id": node_id, "completed": True})
             
-            state.nodes.append(node)
             state.confidence_score = cause_confidence
             return node_id
             
@@ -403,32 +560,24 @@ class InvestigationAgent:
             print(f"Error creating master inference: {e}")
             return validation_node_id or ""
 
-    async def _run_investigation_immediately(self, investigation_id: str):
+    async def _run_investigation_immediately(self, investigation_id: str,
+                                             timeouts: Optional[Dict[str, Optional[float]]] = None):
         """Run comprehensive Claude AI investigation with hierarchical nodes"""
         state = self.investigations[investigation_id]
+        # Attribute Claude token usage in this task (and the tasks it spawns) to the investigation
+        current_investigation.set(investigation_id)
+        publisher = None
+        finished = asyncio.Event()
+        if self.investigations.shared is not None:
+            publisher = asyncio.create_task(self._publish_progress(state, finished))
         
         try:
             print(f"[INFO] Starting comprehensive investigation for {state.symbol}")
             
-            # Phase 1: Data Fetch - Creates main data node
-            price_data_node = await self._fetch_comprehensive_price_data(state)
-            await asyncio.sleep(0.3)
-            
-            # Phase 2: Initial Analysis - Creates decision node 
-            decision_node = await self._analyze_price_movement_decision(state, price_data_node)
-            await asyncio.sleep(0.3)
-            
-            # Phase 3: Spawn Sub-Investigations based on Claude's decision
-            await self._spawn_sub_investigations(state, decision_node)
-            await asyncio.sleep(0.3)
-            
-            # Phase 4: Cross-Validation - Connect separate investigation threads
-            await self._cross_validate_findings(state)
-            await asyncio.sleep(0.3)
-            
-            # Phase 5: Master Inference - Combines all prior research
-            master_inference_node = await self._create_master_inference(state, decision_node, state.cross_validation_nodes)
-            await asyncio.sleep(0.3)
+            graph = self._build_investigation_graph(state, timeouts or self.STEP_TIMEOUTS)
+            await graph.run()
+            print(f"[INFO] Investigation step timings for {state.symbol}: {graph.timings}")
+            self._fail_unfinished_nodes(state)
             
             state.status = "completed"
             print(f"[SUCCESS] Comprehensive investigation completed for {state.symbol}")
@@ -436,80 +585,331 @@ class InvestigationAgent:
         except Exception as e:
             print(f"Investigation error: {e}")
             state.status = "error"
+        
+        finally:
+            finished.set()
+            if publisher is not None:
+                await publisher
+            self.investigations.mark_finished(investigation_id)
+            key = self._dedup_key(state.symbol, state.date_range)
+            if self._dedup_runs.get(key, (None,))[0] == investigation_id:
+                self._dedup_runs[key] = (investigation_id, time.monotonic())
+
+    def _fail_unfinished_nodes(self, state: InvestigationState):
+        """Close nodes left in progress by a step that timed out or failed, so a finished investigation has none"""
+        for node in state.nodes:
+            if node.status != "in_progress":
+                continue
+            node.status = "error"
+            node.description = f"{node.label} did not finish in time"
+            node.data = dict(node.data or {}, error="Step timed out or failed before completing")
+            node.completed_at = datetime.now().isoformat()
+            state.node_updates.append({"node_id": node.id, "completed": True})
 
-    async def start_investigation(self, symbol: str, date_range=None) -> str:
+    async def _publish_progress(self, state: InvestigationState, finished: asyncio.Event):
+        """Write the investigation to the shared backend whenever its nodes or status change.
+        
+        One writer per investigation, so snapshots land in order; the last one is the final state.
+        """
+        published = None
+        while True:
+            fingerprint = (state.status, len(state.nodes), len(state.node_updates))
+            if fingerprint != published or finished.is_set():
+                await self.investigations.publish(state.investigation_id)
+                published = fingerprint
+            if finished.is_set():
+                return
+            try:
+                await asyncio.wait_for(finished.wait(), self.SHARED_STATE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _build_investigation_graph(self, state: InvestigationState,
+                                   timeouts: Dict[str, Optional[float]]) -> TaskGraph:
+        """Investigation phases as a task graph; each step runs as soon as the steps it depends on finish.
+        
+        timeouts maps step names (as in STEP_TIMEOUTS) to seconds, None for no limit. Steps run at full
+        speed; any pacing for display happens when progress is streamed to a client.
+        """
+        # Phase 1: Data Fetch - Creates main data node
+        async def price_data(_):
+            return await self._fetch_comprehensive_price_data(state)
+        
+        # Phase 2: Initial Analysis - Creates decision node
+        async def decision(inputs):
+            return await self._analyze_price_movement_decision(state, inputs["price_data"])
+        
+        # Phase 3: Sub-Investigations based on Claude's decision (run concurrently)
+        async def sub_investigations(inputs):
+            return await self._spawn_sub_investigations(state, inputs["decision"], timeouts["sub_investigation"])
+        
+        # Phase 4: Cross-Validation - Connect separate investigation threads
+        async def cross_validation(_):
+            return await self._cross_validate_findings(state)
+        
+        # Phase 5: Master Inference - Combines all prior research
+        async def master_inference(inputs):
+            return await self._create_master_inference(state, inputs["decision"], state.cross_validation_nodes)
+        
+        graph = TaskGraph()
+        graph.add("price_data", price_data, timeout=timeouts["price_data"])
+        graph.add("decision", decision, depends_on=("price_data",), timeout=timeouts["decision"])
+        # Each branch inside has its own sub_investigation timeout
+        graph.add("sub_investigations", sub_investigations, depends_on=("decision",))
+        graph.add("cross_validation", cross_validation, depends_on=("sub_investigations",),
+                  timeout=timeouts["cross_validation"])
+        graph.add("master_inference", master_inference, depends_on=("decision", "cross_validation"),
+                  timeout=timeouts["master_inference"])
+        return graph
+
+    async def start_investigation(self, symbol: str, date_range: Optional[DateRange] = None) -> str:
         investigation_id = str(uuid.uuid4())
-        initial_state = InvestigationState(investigation_id, symbol.upper())
+        symbol = symbol.upper()
+        
+        if self.dedup_enabled:
+            canonical_id = self._find_shareable_run(symbol, date_range)
+            if canonical_id is not None:
+                await self._add_dedup_alias(investigation_id, canonical_id)
+                return investigation_id
+        
+        initial_state = InvestigationState(investigation_id, symbol, date_range)
         self.investigations[investigation_id] = initial_state
+        if self.dedup_enabled:
+            self._track_dedup_run(self._dedup_key(symbol, date_range), investigation_id)
+        # Visible to every worker before the id is handed out
+        if self.investigations.shared is not None:
+            await self.investigations.publish(investigation_id)
         
         asyncio.create_task(self._run_investigation_immediately(investigation_id))
         return investigation_id
 
-    async def get_investigation_status(self, investigation_id: str) -> Dict[str, Any]:
-        if investigation_id not in self.investigations:
-            return {"error": "Investigation not found"}
+    def _dedup_key(self, symbol: str, date_range: Optional[DateRange]) -> tuple:
+        if date_range is None:
+            return (symbol, None, None, self.PIPELINE_VERSION)
+        return (symbol, date_range.start_date, date_range.end_date, self.PIPELINE_VERSION)
+
+    def _find_shareable_run(self, symbol: str, date_range: Optional[DateRange]) -> Optional[str]:
+        """Investigation an identical request can share: one still running, or one completed within the TTL"""
+        key = self._dedup_key(symbol, date_range)
+        run = self._dedup_runs.get(key)
+        if run is None:
+            return None
         
-        state = self.investigations[investigation_id]
+        canonical_id, finished_at = run
+        state = self.investigations.get(canonical_id)
+        if state is not None and state.status == "active":
+            self.dedup_attached += 1
+            return canonical_id
+        # finished_at is still None while the run is publishing its final state
+        fresh = finished_at is None or time.monotonic() - finished_at < self.dedup_ttl
+        if state is not None and state.status == "completed" and fresh:
+            self.dedup_reused += 1
+            return canonical_id
+        # Failed, stale or evicted: the next request starts a fresh run
+        del self._dedup_runs[key]
+        return None
+
+    def _track_dedup_run(self, key: tuple, investigation_id: str):
+        self._dedup_runs[key] = (investigation_id, None)
+        if len(self._dedup_runs) > self.investigations.max_entries:
+            for stale_key in [k for k, (i, _) in self._dedup_runs.items() if i not in self.investigations]:
+                del self._dedup_runs[stale_key]
+
+    async def _add_dedup_alias(self, investigation_id: str, canonical_id: str):
+        self._dedup_aliases.set(investigation_id, canonical_id)
+        # Persisted like the results themselves, so the alias outlives its in-memory entry and other
+        # workers can resolve it
+        await self.investigations.save_alias(investigation_id, canonical_id)
+
+    async def _resolve_investigation_id(self, investigation_id: str) -> str:
+        """Run behind a request's investigation id: the shared run for a deduplicated request, else the id itself"""
+        canonical_id = self._dedup_aliases.get(investigation_id)
+        if canonical_id is not None:
+            return canonical_id
+        if investigation_id in self.investigations:
+            return investigation_id
+        snapshot = await asyncio.to_thread(self.investigations.load_snapshot, investigation_id)
+        if snapshot is not None and "alias_of" in snapshot:
+            return snapshot["alias_of"]
+        return investigation_id
+
+    def dedup_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.dedup_enabled,
+            "ttl_seconds": self.dedup_ttl,
+            "pipeline_version": self.PIPELINE_VERSION,
+            "tracked_runs": len(self._dedup_runs),
+            "aliases": len(self._dedup_aliases),
+            "attached_to_running": self.dedup_attached,
+            "reused_completed": self.dedup_reused
+        }
+
+    async def run_batch_investigations(self, symbols: List[str],
+                                       date_range: Optional[DateRange] = None) -> List[str]:
+        """Run investigations for many symbols together and wait for all of them to finish.
         
+        Pair with a ClaudeAIService built with a batch_dispatcher: every pipeline queues its Claude
+        prompts into shared batches and resumes when the batch results come back.
+        """
+        investigation_ids = []
+        for symbol in symbols:
+            investigation_id = str(uuid.uuid4())
+            self.investigations[investigation_id] = InvestigationState(investigation_id, symbol.upper(), date_range)
+            investigation_ids.append(investigation_id)
+        
+        # Batch work yields to interactive investigations in the Claude scheduler
+        token = request_priority.set("batch")
+        try:
+            await asyncio.gather(*[
+                self._run_investigation_immediately(i, self.BATCH_STEP_TIMEOUTS) for i in investigation_ids
+            ])
+        finally:
+            request_priority.reset(token)
+        return investigation_ids
+
+    def _serialize_node(self, node: AgentNode) -> Dict[str, Any]:
+        return {
+            "id": node.id,
+            "type": node.type.value,
+            "label": node.label,
+            "description": node.description,
+            "status": node.status,
+            "data": node.data,
+            "parent_id": node.parent_id,
+            "created_at": node.created_at,
+            "completed_at": node.completed_at
+        }
+
+    async def get_investigation_status(self, investigation_id: str) -> Dict[str, Any]:
+        canonical_id = await self._resolve_investigation_id(investigation_id)
+        if canonical_id in self.investigations:
+            status = self._snapshot_state(self.investigations[canonical_id])
+        else:
+            # Running on another worker or evicted from memory: serve the stored snapshot if there is one
+            status = await asyncio.to_thread(self.investigations.load_snapshot, canonical_id)
+            if status is None:
+                return {"error": "Investigation not found"}
+        
+        if canonical_id != investigation_id:
+            status = dict(status, investigation_id=investigation_id, shared_investigation_id=canonical_id)
+        return status
+
+    def _snapshot_state(self, state: InvestigationState) -> Dict[str, Any]:
+        investigation_id = state.investigation_id
         return {
             "investigation_id": investigation_id,
             "symbol": state.symbol,
             "status": state.status,
             "confidence_score": state.confidence_score,
-            "nodes": [
-                {
-                    "id": node.id,
-                    "type": node.type.value,
-                    "label": node.label,
-                    "description": node.description,
-                    "status": node.status,
-                    "data": node.data,
-                    "parent_id": node.parent_id,
-                    "created_at": node.created_at,
-                    "completed_at": node.completed_at
-                }
-                for node in state.nodes
-            ],
+            "nodes": [self._serialize_node(node) for node in state.nodes],
             "current_findings": state.current_findings,
-            "investigation_branches": state.investigation_branches
+            "investigation_branches": state.investigation_branches,
+            "token_usage": self.claude_service.token_budget.investigation_usage(investigation_id) if self.claude_service else None
+        }
+
+    def _collect_stream_events(self, state: InvestigationState, last_node_count: int,
+                               last_update_count: int) -> List[Dict[str, Any]]:
+        """New nodes as node_update events, then node changes as node_updated events"""
+        events = []
+        for node in state.nodes[last_node_count:]:
+            events.append({
+                "type": "node_update",
+                "node": self._serialize_node(node),
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        # Merge the text deltas received since the last poll into one event per node
+        pending_deltas: Dict[str, str] = {}
+        for update in state.node_updates[last_update_count:]:
+            node_id = update["node_id"]
+            if "delta" in update:
+                pending_deltas[node_id] = pending_deltas.get(node_id, "") + update["delta"]
+                continue
+            if node_id in pending_deltas:
+                events.append(self._delta_event(node_id, pending_deltas.pop(node_id)))
+            node = next((n for n in state.nodes if n.id == node_id), None)
+            if node:
+                events.append({
+                    "type": "node_updated",
+                    "node_id": node_id,
+                    "node": self._serialize_node(node),
+                    "timestamp": datetime.now().isoformat()
+                })
+        for node_id, delta in pending_deltas.items():
+            events.append(self._delta_event(node_id, delta))
+        return events
+
+    def _delta_event(self, node_id: str, delta: str) -> Dict[str, Any]:
+        return {
+            "type": "node_updated",
+            "node_id": node_id,
+            "delta": delta,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def _stream_snapshot_progress(self, investigation_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Progress of an investigation held elsewhere: running on another worker or evicted after finishing"""
+        snapshot = await asyncio.to_thread(self.investigations.load_snapshot, investigation_id)
+        if snapshot is None:
+            yield {"type": "error", "message": "Investigation not found"}
+            return
+        
+        sent: Dict[str, Dict[str, Any]] = {}
+        deadline = asyncio.get_running_loop().time() + self.STREAM_TIMEOUT_SECONDS
+        while True:
+            for node in snapshot["nodes"]:
+                previous = sent.get(node["id"])
+                if previous is None:
+                    yield {"type": "node_update", "node": node, "timestamp": datetime.now().isoformat()}
+                elif previous != node:
+                    yield {
+                        "type": "node_updated",
+                        "node_id": node["id"],
+                        "node": node,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                sent[node["id"]] = node
+            if snapshot["status"] != "active" or asyncio.get_running_loop().time() >= deadline:
+                break
+            
+            await asyncio.sleep(self.SHARED_STATE_INTERVAL)
+            snapshot = await asyncio.to_thread(self.investigations.load_snapshot, investigation_id) or snapshot
+        
+        yield {
+            "type": "investigation_complete",
+            "status": snapshot["status"],
+            "confidence_score": snapshot["confidence_score"],
+            "total_nodes": len(snapshot["nodes"]),
+            "timestamp": datetime.now().isoformat()
         }
 
     async def stream_investigation_progress(self, investigation_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+        investigation_id = await self._resolve_investigation_id(investigation_id)
         if investigation_id not in self.investigations:
-            yield {"type": "error", "message": "Investigation not found"}
+            async for event in self._stream_snapshot_progress(investigation_id):
+                yield event
             return
         
         state = self.investigations[investigation_id]
         last_node_count = 0
-        max_iterations = 50
-        iterations = 0
+        last_update_count = 0
+        deadline = asyncio.get_running_loop().time() + self.STREAM_TIMEOUT_SECONDS
         
-        while state.status == "active" and iterations < max_iterations:
+        while state.status == "active" and asyncio.get_running_loop().time() < deadline:
             current_node_count = len(state.nodes)
+            current_update_count = len(state.node_updates)
             
-            if current_node_count > last_node_count:
-                for i in range(last_node_count, current_node_count):
-                    node = state.nodes[i]
-                    yield {
-                        "type": "node_update",
-                        "node": {
-                            "id": node.id,
-                            "type": node.type.value,
-                            "label": node.label,
-                            "description": node.description,
-                            "status": node.status,
-                            "data": node.data,
-                            "parent_id": node.parent_id,
-                            "created_at": node.created_at,
-                            "completed_at": node.completed_at
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    }
-                last_node_count = current_node_count
+            for event in self._collect_stream_events(state, last_node_count, last_update_count):
+                yield event
+            last_node_count = current_node_count
+            last_update_count = current_update_count
             
-            iterations += 1
             await asyncio.sleep(0.1)
         
+        # Flush anything that arrived between the last poll and completion
+        for event in self._collect_stream_events(state, last_node_count, last_update_count):
+            yield event
+        
         yield {
             "type": "investigation_complete",
             "status": state.status,
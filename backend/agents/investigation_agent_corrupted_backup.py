@@ -77,15 +77,12 @@ class InvestigationAgent:
         try:
             # Step 1: Fetch stock data
             await self._fetch_stock_data(state)
-            await asyncio.sleep(1)  # Simulate processing time
             
             # Step 2: Analyze trends
             await self._analyze_trends(state)
-            await asyncio.sleep(1)
             
             # Step 3: Agent decision
             await self._agent_decision(state)
-            await asyncio.sleep(1)
             
             # Step 4: Create inference
             await self._create_inference(state)
@@ -536,7 +533,6 @@ class InvestigationAgent:
         try:
             # Agent decides to fetch earnings data first
             earnings_data_node = await self._spawn_earnings_investigation(state, parent_node_id)
-            await asyncio.sleep(0.2)
             
             # Agent discovers if deeper financial analysis is needed
             stock_data = await self.stock_service.get_stock_quote(state.symbol)
@@ -544,7 +540,6 @@ class InvestigationAgent:
             
             if abs(price_change) > 5:  # Agent decides this needs deeper dive
                 financial_metrics_node = await self._analyze_financial_metrics(state, earnings_data_node)
-                await asyncio.sleep(0.2)
                 return await self._create_financial_inference(state, financial_metrics_node)
             else:
                 return earnings_data_node
@@ -558,13 +553,11 @@ class InvestigationAgent:
         try:
             # Agent starts with basic news sentiment
             news_node = await self._spawn_news_sentiment_investigation(state, parent_node_id)
-            await asyncio.sleep(0.2)
             
             # Agent decides if deeper sentiment analysis is needed
             if len(state.current_findings) > 0 and any("positive" in finding.lower() or "negative" in finding.lower() for finding in state.current_findings):
                 # Agent discovers strong sentiment, digs deeper
                 news_deep_dive = await self._create_news_deep_dive(state, news_node)
-                await asyncio.sleep(0.2)
                 return await self._create_news_inference(state, news_deep_dive)
             else:
                 return news_node
@@ -578,11 +571,9 @@ class InvestigationAgent:
         try:
             # Agent investigates market context
             market_node = await self._spawn_market_context_investigation(state, parent_node_id)
-            await asyncio.sleep(0.2)
             
             # Agent decides if sector analysis is needed
             sector_analysis_node = await self._analyze_sector_performance(state, market_node)
-            await asyncio.sleep(0.2)
             
             return await self._create_market_inference(state, sector_analysis_node)
                 
@@ -840,7 +831,6 @@ class InvestigationAgent:
                     # Agent discovers earnings need verification
                     verification_node = await self._create_earnings_verification(state, node_id)
                     follow_up_nodes.append(verification_node)
-                    await asyncio.sleep(0.2)
             
             return follow_up_nodes
             
@@ -2118,12 +2108,10 @@ Key Findings: Stock movement appears to follow general market patterns.
             # Step 1: Fetch initial data and establish baseline
             price_data_node = await self._fetch_comprehensive_price_data(state)
             print(f"Data collected for {state.symbol}")
-            await asyncio.sleep(0.2)
             
             # Step 2: AI AGENT AUTONOMOUS DECISION MAKING
             decision_node = await self._analyze_price_movement_decision(state, price_data_node)
             print(f"AI agent made investigation decisions for {state.symbol}")
-            await asyncio.sleep(0.2)
             
             # Step 3: SPAWN PARALLEL INVESTIGATIONS based on agent's autonomous decisions
             parallel_tasks = []
@@ -2159,7 +2147,6 @@ Key Findings: Stock movement appears to follow general market patterns.
                         parallel_tasks.append(task)
                     # Add more investigation types as needed
                     
-                    await asyncio.sleep(0.1)  # Stagger spawning
             
             # Step 4: Wait for all parallel investigations to complete with timeout
             if parallel_tasks:
@@ -2178,7 +2165,6 @@ Key Findings: Stock movement appears to follow general market patterns.
                     investigation_nodes = []
             
             # Step 5: AGENT DECIDES if more investigation is needed based on findings
-            await asyncio.sleep(0.3)
             try:
                 follow_up_nodes = await asyncio.wait_for(
                     self._agent_evaluate_and_spawn_followups(state, investigation_nodes),
@@ -2196,7 +2182,6 @@ Key Findings: Stock movement appears to follow general market patterns.
                         timeout=5.0
                     )
                     print(f"Agent completed cross-validation of {len(investigation_nodes)} investigation threads")
-                    await asyncio.sleep(0.3)
                     
                     # Step 7: MASTER INFERENCE - Agent synthesizes all findings
                     all_nodes = investigation_nodes + follow_up_nodes + [validation_node]
@@ -0,0 +1,353 @@
+"""
+Bounded store for investigation state: LRU cap, TTL for finished investigations, memory accounting,
+optional spill of evicted results to a snapshot backend and optional publishing of live state to a
+backend shared by every worker
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+FINISHED_STATUSES = ("completed", "error")
+
+
+class SnapshotBackend(ABC):
+    """Persistent home for serialized investigations (the get_investigation_status payload).
+
+    save() takes the snapshot already encoded as JSON, so callers can encode it where the state is safe
+    to read and hand only the write to another thread.
+    """
+
+    @abstractmethod
+    def save(self, investigation_id: str, payload: str):
+        """Store the JSON-encoded snapshot, replacing any earlier one"""
+
+    @abstractmethod
+    def load(self, investigation_id: str) -> Optional[Dict[str, Any]]:
+        """Decoded snapshot, or None when there is none (or it has expired)"""
+
+    @abstractmethod
+    def delete(self, investigation_id: str):
+        """Remove the snapshot if present"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+
+class SQLiteSnapshotBackend(SnapshotBackend):
+    """Snapshots as JSON rows in a local SQLite file; rows older than `ttl` seconds are purged on write"""
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS investigation_snapshots (
+                    investigation_id TEXT PRIMARY KEY,
+                    snapshot TEXT NOT NULL,
+                    saved_at REAL NOT NULL
+                )
+            """)
+
+    def save(self, investigation_id: str, payload: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO investigation_snapshots (investigation_id, snapshot, saved_at) VALUES (?, ?, ?)",
+                (investigation_id, payload, time.time())
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM investigation_snapshots WHERE saved_at < ?", (time.time() - self.ttl,))
+
+    def load(self, investigation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot FROM investigation_snapshots WHERE investigation_id = ?", (investigation_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, investigation_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM investigation_snapshots WHERE investigation_id = ?", (investigation_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM investigation_snapshots").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "snapshots": count}
+
+
+class InMemorySnapshotBackend(SnapshotBackend):
+    """Process-local snapshots; stands in for Redis in tests and single-worker runs"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._snapshots: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def save(self, investigation_id: str, payload: str):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        # Kept as JSON so readers never share mutable state with the writer, as with Redis
+        with self._lock:
+            self._snapshots[investigation_id] = (payload, expires_at)
+
+    def load(self, investigation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._snapshots.get(investigation_id)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._snapshots[investigation_id]
+                return None
+        return json.loads(payload)
+
+    def delete(self, investigation_id: str):
+        with self._lock:
+            self._snapshots.pop(investigation_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "snapshots": len(self._snapshots)}
+
+
+class RedisSnapshotBackend(SnapshotBackend):
+    """Snapshots as JSON strings in Redis, shared by every worker and host pointed at the same server"""
+
+    def __init__(self, url: str, ttl: Optional[float] = None, prefix: str = "investigation:"):
+        import redis
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=5)
+        self.url = url.split("@")[-1]  # don't report credentials in stats
+
+    def _key(self, investigation_id: str) -> str:
+        return f"{self.prefix}{investigation_id}"
+
+    def save(self, investigation_id: str, payload: str):
+        self._client.set(self._key(investigation_id), payload, ex=int(self.ttl) if self.ttl else None)
+
+    def load(self, investigation_id: str) -> Optional[Dict[str, Any]]:
+        payload = self._client.get(self._key(investigation_id))
+        return json.loads(payload) if payload else None
+
+    def delete(self, investigation_id: str):
+        self._client.delete(self._key(investigation_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "url": self.url, "prefix": self.prefix}
+
+
+class InvestigationStore:
+    """Dict-like store of live investigation states with bounded memory.
+
+    Finished investigations expire `completed_ttl` seconds after they finish, and the least recently
+    used finished ones are evicted beyond `max_entries` or `max_bytes`. Active investigations are never
+    evicted. Evicted investigations are serialized to the spill backend, if one is configured, so
+    their results can still be served. Serialization for size accounting and spill writes happen on a
+    single background thread, since the store is used from the event loop; the byte limit is enforced
+    once a finished investigation has been measured.
+
+    With a `shared` backend, callers publish the live state of their investigations to it so any
+    worker can serve status and progress for investigations running elsewhere.
+    """
+
+    def __init__(self, serializer: Callable[[Any], Dict[str, Any]], max_entries: int = 1000,
+                 completed_ttl: float = 3600.0, max_bytes: Optional[int] = None,
+                 spill: Optional[SnapshotBackend] = None, shared: Optional[SnapshotBackend] = None):
+        self.serializer = serializer
+        self.max_entries = max_entries
+        self.completed_ttl = completed_ttl
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self.shared = shared
+
+        self._states: "OrderedDict[str, Any]" = OrderedDict()
+        self._finished_at: "OrderedDict[str, float]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        # Evicted states whose spill write is still queued; served from here until it lands
+        self._pending_spills: Dict[str, Any] = {}
+        # Guards the fields above, which the I/O thread updates
+        self._lock = threading.Lock()
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="investigation-store")
+        self.evictions = 0
+        self.expirations = 0
+        self.spilled = 0
+        self.published = 0
+
+    def __contains__(self, investigation_id: str) -> bool:
+        self._expire()
+        return investigation_id in self._states
+
+    def __getitem__(self, investigation_id: str):
+        self._expire()
+        state = self._states[investigation_id]
+        self._states.move_to_end(investigation_id)
+        return state
+
+    def get(self, investigation_id: str, default: Any = None):
+        try:
+            return self[investigation_id]
+        except KeyError:
+            return default
+
+    def __setitem__(self, investigation_id: str, state: Any):
+        self._states[investigation_id] = state
+        self._states.move_to_end(investigation_id)
+        self._enforce_limits()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._states))
+
+    def values(self):
+        return list(self._states.values())
+
+    def mark_finished(self, investigation_id: str):
+        """Start the TTL clock and queue measuring the investigation's final size"""
+        state = self._states.get(investigation_id)
+        if state is None:
+            return
+        self._finished_at.pop(investigation_id, None)
+        self._finished_at[investigation_id] = time.monotonic()
+        # A finished state is no longer modified, so the I/O thread can serialize it
+        self._io.submit(self._measure, investigation_id, state)
+        self._enforce_limits()
+
+    def _measure(self, investigation_id: str, state: Any):
+        size = len(json.dumps(self.serializer(state), default=str))
+        with self._lock:
+            if self._states.get(investigation_id) is not state:
+                return  # evicted before it was measured
+            self.total_bytes += size - self._sizes.get(investigation_id, 0)
+            self._sizes[investigation_id] = size
+
+    def flush(self):
+        """Block until queued measurements and spill writes are done"""
+        self._io.submit(lambda: None).result()
+
+    async def publish(self, investigation_id: str):
+        """Write the investigation's current state to the shared backend.
+
+        The snapshot is encoded here, on the event loop that modifies the state; only the write runs
+        in a thread.
+        """
+        state = self._states.get(investigation_id)
+        if state is None or self.shared is None:
+            return
+        payload = json.dumps(self.serializer(state), default=str)
+        try:
+            await asyncio.to_thread(self.shared.save, investigation_id, payload)
+            self.published += 1
+        except Exception as e:
+            print(f"[WARNING] Could not publish investigation {investigation_id}: {e}")
+
+    async def save_alias(self, alias_id: str, investigation_id: str):
+        """Record that alias_id resolves to investigation_id in the spill and shared backends"""
+        payload = json.dumps({"alias_of": investigation_id})
+        if self.spill is not None:
+            self._io.submit(self._write_alias, alias_id, payload)
+        if self.shared is not None:
+            try:
+                await asyncio.to_thread(self.shared.save, alias_id, payload)
+            except Exception as e:
+                print(f"[WARNING] Could not share alias {alias_id}: {e}")
+
+    def _write_alias(self, alias_id: str, payload: str):
+        try:
+            self.spill.save(alias_id, payload)
+        except Exception as e:
+            print(f"[WARNING] Could not spill alias {alias_id}: {e}")
+
+    def load_snapshot(self, investigation_id: str) -> Optional[Dict[str, Any]]:
+        """Serialized state of an investigation not held in this process (running elsewhere or evicted)"""
+        pending = self._pending_spills.get(investigation_id)
+        if pending is not None:
+            return self.serializer(pending)
+        for backend in (self.shared, self.spill):
+            if backend is None:
+                continue
+            try:
+                snapshot = backend.load(investigation_id)
+            except Exception as e:
+                print(f"[WARNING] Could not load investigation {investigation_id}: {e}")
+                continue
+            if snapshot is not None:
+                return snapshot
+        return None
+
+    def _expire(self):
+        if not self._finished_at:
+            return
+        cutoff = time.monotonic() - self.completed_ttl
+        # _finished_at is in finishing order, so expired entries are at the front
+        while self._finished_at:
+            investigation_id, finished_at = next(iter(self._finished_at.items()))
+            if finished_at > cutoff:
+                break
+            self._evict(investigation_id)
+            self.expirations += 1
+
+    def _enforce_limits(self):
+        self._expire()
+        for investigation_id in list(self._states):
+            over_entries = len(self._states) > self.max_entries
+            with self._lock:
+                over_bytes = self.max_bytes is not None and self.total_bytes > self.max_bytes
+            if not (over_entries or over_bytes):
+                break
+            # Least recently used first; active investigations stay until they finish
+            if investigation_id in self._finished_at:
+                self._evict(investigation_id)
+                self.evictions += 1
+
+    def _evict(self, investigation_id: str):
+        state = self._states.pop(investigation_id, None)
+        self._finished_at.pop(investigation_id, None)
+        with self._lock:
+            self.total_bytes -= self._sizes.pop(investigation_id, 0)
+            if state is None or self.spill is None:
+                return
+            self._pending_spills[investigation_id] = state
+        self._io.submit(self._write_spill, investigation_id, state)
+
+    def _write_spill(self, investigation_id: str, state: Any):
+        try:
+            self.spill.save(investigation_id, json.dumps(self.serializer(state), default=str))
+            self.spilled += 1
+        except Exception as e:
+            print(f"[WARNING] Could not spill investigation {investigation_id}: {e}")
+        finally:
+            with self._lock:
+                if self._pending_spills.get(investigation_id) is state:
+                    del self._pending_spills[investigation_id]
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        return {
+            "investigations": len(self._states),
+            "active": len(self._states) - len(self._finished_at),
+            "max_entries": self.max_entries,
+            "completed_ttl_seconds": self.completed_ttl,
+            "finished_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "spilled": self.spilled,
+            "pending_spills": len(self._pending_spills),
+            "spill": self.spill.stats() if self.spill else None,
+            "published": self.published,
+            "shared": self.shared.stats() if self.shared else None
+        }
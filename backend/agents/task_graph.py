@@ -0,0 +1,107 @@
+"""
+Dependency-driven step scheduler: every step whose inputs are ready runs concurrently
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class TaskStep:
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 depends_on: Tuple[str, ...], timeout: Optional[float]):
+        self.name = name
+        self.run = run
+        self.depends_on = depends_on
+        self.timeout = timeout
+
+
+class TaskGraph:
+    """Declarative graph of async steps.
+
+    Each step receives the results of the steps it depends on (keyed by step name) and starts as soon
+    as they have all finished, so wall-clock time follows the critical path. A step that fails or
+    exceeds its timeout yields None for its dependents instead of stopping the graph.
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None):
+        self.default_timeout = default_timeout
+        self.steps: Dict[str, TaskStep] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, run: Callable[[Dict[str, Any]], Awaitable[Any]],
+            depends_on: Tuple[str, ...] = (), timeout: Optional[float] = None) -> "TaskGraph":
+        if name in self.steps:
+            raise ValueError(f"Duplicate step '{name}'")
+        self.steps[name] = TaskStep(name, run, tuple(depends_on), timeout or self.default_timeout)
+        return self
+
+    def _validate(self):
+        for step in self.steps.values():
+            missing = [dependency for dependency in step.depends_on if dependency not in self.steps]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps {missing}")
+
+        # Kahn's algorithm: every step must become ready at some point
+        remaining = {name: len(step.depends_on) for name, step in self.steps.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for dependent in self._dependents(name):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(self.steps):
+            raise ValueError("Task graph contains a dependency cycle")
+
+    def _dependents(self, name: str) -> List[str]:
+        return [step.name for step in self.steps.values() if name in step.depends_on]
+
+    async def _run_step(self, step: TaskStep) -> Any:
+        inputs = {dependency: self.results.get(dependency) for dependency in step.depends_on}
+        started = time.monotonic()
+        try:
+            if step.timeout:
+                return await asyncio.wait_for(step.run(inputs), step.timeout)
+            return await step.run(inputs)
+        finally:
+            self.timings[step.name] = round(time.monotonic() - started, 3)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every step once; returns results by step name"""
+        self._validate()
+        waiting_on = {name: set(step.depends_on) for name, step in self.steps.items()}
+        running: Dict[asyncio.Task, str] = {}
+
+        def start_ready():
+            for name in [name for name, deps in waiting_on.items() if not deps]:
+                del waiting_on[name]
+                running[asyncio.ensure_future(self._run_step(self.steps[name]))] = name
+
+        start_ready()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        self.results[name] = task.result()
+                    except asyncio.TimeoutError as e:
+                        print(f"[WARNING] Step '{name}' timed out after {self.steps[name].timeout}s")
+                        self.errors[name] = e
+                        self.results[name] = None
+                    except Exception as e:
+                        print(f"[WARNING] Step '{name}' failed: {e}")
+                        self.errors[name] = e
+                        self.results[name] = None
+                    for deps in waiting_on.values():
+                        deps.discard(name)
+                start_ready()
+        finally:
+            # If the graph itself is cancelled, don't leave steps running in the background
+            for task in running:
+                task.cancel()
+        return self.results
@@ -0,0 +1,69 @@
+"""
+Nightly batch investigations: run many symbols through InvestigationAgent with Claude calls
+submitted as offline batches instead of one interactive request each.
+
+    python batch_investigate.py AAPL MSFT NVDA
+    python batch_investigate.py --symbols-file sp500.txt --backend anthropic --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from agents.investigation_agent import InvestigationAgent
+from services.claude_ai_service import ClaudeAIService
+from services.llm_batch import AnthropicBatchBackend, BatchDispatcher, LocalBatchBackend
+
+
+async def run_batch(symbols, backend_name: str, output: str, flush_interval: float, poll_interval: float):
+    claude_service = ClaudeAIService()
+    if backend_name == "anthropic":
+        backend = AnthropicBatchBackend(claude_service.api_key)
+    else:
+        # Stand-in that sends the batched requests through the regular Messages API
+        backend = LocalBatchBackend(claude_service._create_message, concurrency=claude_service.max_concurrency)
+    claude_service.batch_dispatcher = BatchDispatcher(
+        backend, flush_interval=flush_interval, poll_interval=poll_interval
+    )
+
+    agent = InvestigationAgent(claude_service=claude_service)
+    try:
+        investigation_ids = await agent.run_batch_investigations(symbols)
+        results = [await agent.get_investigation_status(i) for i in investigation_ids]
+    finally:
+        await agent.stock_service.aclose()
+        if isinstance(backend, AnthropicBatchBackend):
+            await backend.aclose()
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+
+    completed = sum(1 for r in results if r["status"] == "completed")
+    print(f"[SUCCESS] {completed}/{len(results)} investigations completed, results written to {output}")
+    print(json.dumps(claude_service.get_stats()["batch"], indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run investigations for many symbols using batched Claude calls")
+    parser.add_argument("symbols", nargs="*", help="Ticker symbols to investigate")
+    parser.add_argument("--symbols-file", help="File with one ticker symbol per line")
+    parser.add_argument("--backend", choices=["local", "anthropic"], default=os.getenv("CLAUDE_BATCH_BACKEND", "local"))
+    parser.add_argument("--output", default="batch_results.json")
+    parser.add_argument("--flush-interval", type=float, default=2.0,
+                        help="Seconds to collect prompts before submitting a batch")
+    parser.add_argument("--poll-interval", type=float, default=30.0,
+                        help="Seconds between batch status checks")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    if not symbols:
+        parser.error("no symbols given")
+
+    asyncio.run(run_batch(symbols, args.backend, args.output, args.flush_interval, args.poll_interval))
+
+
+if __name__ == "__main__":
+    main()
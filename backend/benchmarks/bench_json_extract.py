@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: Claude response JSON parsing (legacy regex chain vs single-pass extractor)
+
+    cd backend && python -m benchmarks.bench_json_extract
+    cd backend && python -m benchmarks.bench_json_extract --corpus captured_responses.jsonl
+
+A corpus file has one JSON string (a raw Claude response) per line. Without one, a built-in corpus
+shaped like the responses our prompts produce is used, including padded ~10 KB variants.
+"""
+import argparse
+import json
+import re
+import timeit
+from typing import Any, Dict, List, Optional
+
+from services.json_extract import extract_json_object, parse_partial_json
+
+REASONING = (
+    "Shares moved after the company raised full-year guidance, citing stronger data-center demand and "
+    "improving gross margins. Options activity and analyst revisions in the prior session suggest the "
+    "move was anticipated by part of the market, while broader indices were flat. "
+)
+
+PRICE_MOVEMENT = {
+    "executive_summary": "Stock rose 4.12% on raised guidance",
+    "primary_cause": "Guidance raise",
+    "detailed_reasoning": REASONING,
+    "confidence_score": 0.82,
+    "cause_confidence": 0.78
+}
+
+SENTIMENT = {
+    "overall_sentiment": "positive",
+    "sentiment_score": 0.64,
+    "key_themes": ["guidance", "margins", "data center"],
+    "impact_assessment": "Coverage is consistent with the direction and size of the move."
+}
+
+
+def _padded(payload: Dict[str, Any], size: int) -> Dict[str, Any]:
+    padded = dict(payload)
+    padded["detailed_reasoning"] = (REASONING * (size // len(REASONING) + 1))[:size]
+    return padded
+
+
+def builtin_corpus() -> List[str]:
+    price = json.dumps(PRICE_MOVEMENT, indent=2)
+    sentiment = json.dumps(SENTIMENT, indent=2)
+    long_price = json.dumps(_padded(PRICE_MOVEMENT, 10_000), indent=2)
+    return [
+        price,
+        f"```json\n{price}\n```",
+        f"Here is my analysis of the move:\n\n{sentiment}\n\nLet me know if you need more detail.",
+        price.replace(REASONING, REASONING.replace(". ", ".\n")),  # raw newlines inside a string
+        f"Based on the {{news}} provided, here is the result:\n{price}",
+        long_price,
+        f"```json\n{long_price}\n```",
+        f"{REASONING * 40}\n{long_price}\nThat concludes the analysis.",
+        long_price[:-200],  # truncated at max_tokens
+    ]
+
+
+# Reference implementation the extractor replaced (patterns compiled per call, as before)
+def legacy_parse(content: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    cleaned_content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
+    for pattern in [r'```json\s*(\{.*?\})\s*```', r'```\s*(\{.*?\})\s*```',
+                    r'(\{[^{}]*\{[^{}]*\}[^{}]*\})', r'(\{[^{}]+\})']:
+        matches = re.findall(pattern, cleaned_content, re.DOTALL)
+        if matches:
+            try:
+                return json.loads(matches[0].strip())
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def new_parse(content: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    return extract_json_object(content) or parse_partial_json(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL file of raw Claude responses")
+    parser.add_argument("--number", type=int, default=200, help="Parses per response per run")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+    else:
+        corpus = builtin_corpus()
+
+    print(f"{'#':>3} {'bytes':>7} {'legacy us':>10} {'new us':>9} {'legacy ok':>9} {'new ok':>7}")
+    totals = {"legacy": 0.0, "new": 0.0}
+    for index, response in enumerate(corpus):
+        row = {}
+        for name, parse in (("legacy", legacy_parse), ("new", new_parse)):
+            seconds = min(timeit.repeat(lambda: parse(response), number=args.number, repeat=3))
+            row[name] = seconds / args.number * 1e6
+            totals[name] += row[name]
+        print(f"{index:>3} {len(response):>7} {row['legacy']:>10.1f} {row['new']:>9.1f} "
+              f"{str(legacy_parse(response) is not None):>9} {str(new_parse(response) is not None):>7}")
+
+    print(f"total per corpus pass: legacy {totals['legacy']:.1f} us, new {totals['new']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ Respond with valid JSON only:
   "detailed_reasoning": "explanation"
 }"""
 
-        response = service.client.messages.create(
+        response = await service.client.messages.create(
             model=service.model,
             max_tokens=800,
             temperature=0.2,
@@ -1,23 +1,41 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
+import math
+import os
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 import yfinance as yf
 
 # Import our LangGraph agent
 from agents.investigation_agent import InvestigationAgent
-from models.schemas import StockInvestigationRequest, InvestigationResponse, AgentNode
-from services.stock_data_service import StockDataService
-
-app = FastAPI(title="Agentic AI Stock Investigation System", version="1.0.0")
+from models.schemas import StockInvestigationRequest, StockBatchValidationRequest, InvestigationResponse, AgentNode
+from services.llm_scheduler import request_tenant
 
 # Initialize a single global agent instance
 agent = InvestigationAgent()
-stock_service = StockDataService()
+# Share the agent's stock service so the whole process uses one pooled HTTP client
+stock_service = agent.stock_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close pooled upstream connections cleanly on shutdown
+    await stock_service.aclose()
+
+app = FastAPI(title="Agentic AI Stock Investigation System", version="1.0.0", lifespan=lifespan)
+
+# Upper bound on symbols accepted by the batch validation endpoint
+MAX_BATCH_SYMBOLS = 500
+
+# Default delay between new nodes when replaying an investigation over the WebSocket, so the graph
+# builds up visibly in the UI; clients override it with ?pace=<seconds> (0 disables)
+WS_REPLAY_PACE = float(os.getenv("WS_REPLAY_PACE", "0.3"))
+MAX_WS_REPLAY_PACE = 5.0
 
 # CORS middleware
 app.add_middleware(
@@ -61,6 +79,56 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/api/stock-data/stats")
+async def stock_data_stats():
+    """Operational statistics for the stock data service (connection pool usage)"""
+    return stock_service.get_stats()
+
+def _build_validation_response(symbol: str, stock_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stock quote into the validate-stock response"""
+    return {
+        "symbol": symbol,
+        "valid": True,
+        "current_price": stock_data["current_price"],
+        "change": stock_data["change"],
+        "change_percent": stock_data["change_percent"],
+        "volume": stock_data["volume"],
+        "market_cap": stock_data.get("market_cap"),
+        "company_name": f"{symbol} Corporation",  # We'll enhance this later
+        "sector": "Technology",  # Default for demo
+        "timestamp": datetime.now().isoformat(),
+        "data_source": stock_data.get("source", "unknown")
+    }
+
+def _build_fallback_validation_response(symbol: str, error: Exception) -> Dict[str, Any]:
+    """Basic validate-stock response for demo purposes when quote lookup fails"""
+    return {
+        "symbol": symbol.upper(),
+        "valid": True,
+        "current_price": 100.0,
+        "change": 0.0,
+        "change_percent": "0.00%",
+        "volume": 1000000,
+        "market_cap": 100000000,
+        "company_name": f"{symbol} Company",
+        "sector": "Demo",
+        "timestamp": datetime.now().isoformat(),
+        "data_source": "fallback",
+        "error": str(error)
+    }
+
+@app.get("/api/investigations/stats")
+async def investigation_store_stats():
+    """Operational statistics for the investigation store (entries, memory, evictions, spill, dedup)"""
+    return {**agent.investigations.stats(), "dedup": agent.dedup_stats()}
+
+@app.get("/api/claude/stats")
+async def claude_stats():
+    """Operational statistics for the Claude service (response cache usage)"""
+    if not agent.claude_service:
+        return {"enabled": False}
+    return agent.claude_service.get_stats()
+
 @app.post("/api/validate-stock", response_model=Dict[str, Any])
 async def validate_stock_data(request: StockInvestigationRequest):
     """Validate stock symbol and fetch basic market data"""
@@ -70,43 +138,41 @@ async def validate_stock_data(request: StockInvestigationRequest):
         # Use our new stock data service
         stock_data = await stock_service.get_stock_quote(symbol)
         
-        return {
-            "symbol": symbol,
-            "valid": True,
-            "current_price": stock_data["current_price"],
-            "change": stock_data["change"],
-            "change_percent": stock_data["change_percent"],
-            "volume": stock_data["volume"],
-            "market_cap": stock_data.get("market_cap"),
-            "company_name": f"{symbol} Corporation",  # We'll enhance this later
-            "sector": "Technology",  # Default for demo
-            "timestamp": datetime.now().isoformat(),
-            "data_source": stock_data.get("source", "unknown")
-        }
+        return _build_validation_response(symbol, stock_data)
         
     except Exception as e:
         # Return basic response for demo purposes
-        return {
-            "symbol": request.symbol.upper(),
-            "valid": True,
-            "current_price": 100.0,
-            "change": 0.0,
-            "change_percent": "0.00%",
-            "volume": 1000000,
-            "market_cap": 100000000,
-            "company_name": f"{request.symbol} Company",
-            "sector": "Demo",
-            "timestamp": datetime.now().isoformat(),
-            "data_source": "fallback",
-            "error": str(e)
-        }
+        return _build_fallback_validation_response(request.symbol, e)
+
+@app.post("/api/validate-stocks", response_model=Dict[str, Any])
+async def validate_stocks_data(request: StockBatchValidationRequest):
+    """Validate many stock symbols and fetch their market data in one round trip"""
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in request.symbols if symbol.strip()))
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SYMBOLS} symbols per request")
+    
+    try:
+        quotes = await stock_service.get_stock_quotes(symbols)
+        results = [_build_validation_response(symbol, quotes[symbol]) for symbol in symbols]
+    except Exception as e:
+        results = [_build_fallback_validation_response(symbol, e) for symbol in symbols]
+    
+    return {
+        "count": len(results),
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
 
 @app.post("/api/investigate", response_model=InvestigationResponse)
-async def start_investigation(request: StockInvestigationRequest):
+async def start_investigation(request: StockInvestigationRequest, x_tenant_id: Optional[str] = Header(None)):
     """Start autonomous AI investigation of a stock"""
     try:
         print(f"Starting investigation for {request.symbol}")
         
+        # Claude concurrency is shared fairly between tenants; the investigation task inherits this
+        if x_tenant_id:
+            request_tenant.set(x_tenant_id)
+        
         # Use the global agent instance
         investigation_id = await agent.start_investigation(request.symbol, request.date_range)
         print(f"Investigation started with ID: {investigation_id}")
@@ -137,11 +203,21 @@ async def websocket_investigation_stream(websocket: WebSocket, investigation_id:
     await manager.connect(websocket)
     print(f"WebSocket connected for investigation: {investigation_id}")
     
+    try:
+        pace = float(websocket.query_params.get("pace", WS_REPLAY_PACE))
+    except ValueError:
+        pace = WS_REPLAY_PACE
+    # NaN slips through min/max (comparisons are false) and would make sleep() never return
+    pace = min(max(pace, 0.0), MAX_WS_REPLAY_PACE) if math.isfinite(pace) else WS_REPLAY_PACE
+    
     try:
         # Use the global agent instance
         async for update in agent.stream_investigation_progress(investigation_id):
             print(f"Sending update: {update.get('type')}")
             await websocket.send_text(json.dumps(update))
+            # Pacing is presentation only: the investigation itself has already moved on
+            if pace and update.get("type") == "node_update":
+                await asyncio.sleep(pace)
             
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for investigation: {investigation_id}")
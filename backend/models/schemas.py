@@ -11,6 +11,9 @@ class StockInvestigationRequest(BaseModel):
     symbol: str
     date_range: Optional[DateRange] = None
 
+class StockBatchValidationRequest(BaseModel):
+    symbols: List[str]
+
 class InvestigationResponse(BaseModel):
     investigation_id: str
     status: str
@@ -0,0 +1,128 @@
+"""
+Persistent local store for daily OHLCV bars (SQLite)
+"""
+import os
+import sqlite3
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.price_series import PriceSeries
+
+
+class BarStore:
+    """On-disk daily bar cache so history is read locally and only the missing tail is fetched upstream"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Calls arrive from worker threads (asyncio.to_thread), so share one connection behind a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily_bars (
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volume INTEGER NOT NULL,
+                    PRIMARY KEY (symbol, date)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS symbol_refresh (
+                    symbol TEXT PRIMARY KEY,
+                    refreshed_on TEXT NOT NULL,
+                    full_history INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def get_series(self, symbol: str, limit: Optional[int] = None,
+                   start_date: Optional[str] = None, end_date: Optional[str] = None) -> PriceSeries:
+        """Stored bars for a symbol, optionally limited to a date range and/or the latest `limit` bars"""
+        query = "SELECT date, open, high, low, close, volume FROM daily_bars WHERE symbol = ?"
+        params: List[Any] = [symbol]
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date)
+        query += " ORDER BY date DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if not rows:
+            return PriceSeries.empty(symbol, "bar_store")
+        return PriceSeries.from_columns(symbol, *zip(*rows), source="bar_store")
+
+    def upsert_series(self, symbol: str, series: PriceSeries) -> int:
+        """Insert or replace bars; returns the number of rows written"""
+        rows = zip(
+            [symbol] * len(series), series.date_strings(), series.open.tolist(), series.high.tolist(),
+            series.low.tolist(), series.close.tolist(), series.volume.tolist()
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_bars (symbol, date, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(series)
+
+    def date_bounds(self, symbol: str) -> Tuple[Optional[str], Optional[str]]:
+        """Earliest and latest stored bar dates for a symbol"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(date), MAX(date) FROM daily_bars WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def bar_count(self, symbol: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM daily_bars WHERE symbol = ?", (symbol,)).fetchone()
+        return row[0]
+
+    def refresh_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed_on, full_history FROM symbol_refresh WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"refreshed_on": row[0], "full_history": bool(row[1])}
+
+    def is_fresh(self, symbol: str) -> bool:
+        """Whether the symbol was already refreshed from upstream today"""
+        info = self.refresh_info(symbol)
+        return bool(info) and info["refreshed_on"] == date.today().isoformat()
+
+    def mark_refreshed(self, symbol: str, full_history: bool = False):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO symbol_refresh (symbol, refreshed_on, full_history) VALUES (?, ?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET refreshed_on = excluded.refreshed_on, "
+                "full_history = MAX(symbol_refresh.full_history, excluded.full_history)",
+                (symbol, date.today().isoformat(), int(full_history))
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            symbols, bars = self._conn.execute(
+                "SELECT COUNT(DISTINCT symbol), COUNT(*) FROM daily_bars"
+            ).fetchone()
+        return {"path": self.path, "symbols": symbols, "bars": bars}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
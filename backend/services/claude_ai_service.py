@@ -1,20 +1,247 @@
 import os
 import json
 import re
-from typing import Dict, List, Any, Optional
-from anthropic import Anthropic
+from typing import Dict, List, Any, Optional, Callable
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 
+from services.json_extract import extract_json_object, parse_partial_json
+from services.llm_batch import BatchDispatcher
+from services.llm_cache import LLMResponseCache, make_cache_key
+from services.llm_scheduler import LLMScheduler
+from services.token_budget import TokenBudget, estimate_tokens
+from services.ttl_cache import SingleFlight
+
 load_dotenv()
 
+# Section headers in consolidated (multi-task) completions, e.g. "=== PRICE_MOVEMENT ==="
+SECTION_HEADER = re.compile(r"^=== ([A-Z_]+) ===[ \t]*$", re.MULTILINE)
+
+# Last-resort field extraction when a response contains no usable JSON object
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+JSON_KEY_PATTERNS = [
+    ("executive_summary", re.compile(r'"executive_summary":\s*"([^"]*)"')),
+    ("primary_cause", re.compile(r'"primary_cause":\s*"([^"]*)"')),
+    ("detailed_reasoning", re.compile(r'"detailed_reasoning":\s*"([^"]*)"')),
+    ("confidence_score", re.compile(r'"confidence_score":\s*([0-9.]+)')),
+    ("cause_confidence", re.compile(r'"cause_confidence":\s*([0-9.]+)'))
+]
+
+# Instructions shared by every request, stated once here rather than repeated in each prompt body
+SYSTEM_PROMPT = """You are an equity research analyst investigating why a stock's price moved. Reason only from the data you are given and explain what actually happened in plain language. Don't score, categorize or use preset frameworks. Think step by step and be specific about causes."""
+
+# Model tier per call site: short classification-style calls go to the small model and only the
+# master inference needs the large one. Unlisted call sites use the large model.
+DEFAULT_MODEL_ROUTES = {
+    "price_movement": "small",
+    "news_sentiment": "small",
+    "earnings_impact": "small",
+    "investigation_bundle": "small",
+    "investigation_decision": "small",
+    "master_inference": "large"
+}
+
+def parse_model_routes(spec: str) -> Dict[str, str]:
+    """Parse "call_site=tier,..." where tier is small, large or a full model id"""
+    routes = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        call_site, tier = item.split("=", 1)
+        routes[call_site.strip()] = tier.strip()
+    return routes
+
 class ClaudeAIService:
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, response_cache: Optional[LLMResponseCache] = None,
+                 batch_dispatcher: Optional[BatchDispatcher] = None, token_budget: Optional[TokenBudget] = None,
+                 scheduler: Optional[LLMScheduler] = None):
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
         
-        self.client = Anthropic(api_key=self.api_key)
-        self.model = "claude-3-5-sonnet-20241022"  # Latest Claude model
+        # Async client so Claude calls never block the event loop; retries are left to the scheduler
+        self.client = AsyncAnthropic(api_key=self.api_key, max_retries=0)
+        self.model = os.getenv("CLAUDE_MODEL_LARGE", "claude-3-5-sonnet-20241022")
+        self.small_model = os.getenv("CLAUDE_MODEL_SMALL", "claude-3-5-haiku-20241022")
+        self.model_routes = {**DEFAULT_MODEL_ROUTES, **parse_model_routes(os.getenv("CLAUDE_MODEL_ROUTES", ""))}
+        # Retry on the large model when a small model's answer can't be parsed
+        self.escalate_on_parse_failure = os.getenv("CLAUDE_ESCALATE_ON_PARSE_FAILURE", "true").lower() == "true"
+        self.escalations = 0
+        
+        # Every request goes through the scheduler: global / per-tenant concurrency, priority lanes, 429 backoff
+        if scheduler is None:
+            tenant_concurrency = os.getenv("CLAUDE_TENANT_CONCURRENCY")
+            scheduler = LLMScheduler(
+                max_concurrency=max_concurrency or int(os.getenv("CLAUDE_MAX_CONCURRENCY", "8")),
+                per_tenant_concurrency=int(tenant_concurrency) if tenant_concurrency else None,
+                max_retries=int(os.getenv("CLAUDE_MAX_RETRIES", "3"))
+            )
+        self.scheduler = scheduler
+        self.max_concurrency = scheduler.max_concurrency
+        
+        # Completion cache keyed on model, temperature, max_tokens and the normalized prompt
+        if response_cache is None:
+            response_cache = LLMResponseCache(
+                max_entries=int(os.getenv("CLAUDE_CACHE_SIZE", "512")),
+                ttl=float(os.getenv("CLAUDE_CACHE_TTL", "900")),
+                sqlite_path=os.getenv("CLAUDE_CACHE_SQLITE_PATH") or None,
+                max_rows=int(os.getenv("CLAUDE_CACHE_SQLITE_MAX_ROWS", "10000"))
+            )
+        self.response_cache = response_cache
+        self._completion_flights = SingleFlight()
+        # Optional bucketing of percentages in cache keys (e.g. 0.5 -> 2.31% and 2.44% share an entry)
+        percent_bucket = os.getenv("CLAUDE_CACHE_PERCENT_BUCKET")
+        self.cache_percent_bucket: Optional[float] = float(percent_bucket) if percent_bucket else None
+        
+        # Consolidated mode answers price movement and news sentiment in a single request
+        self.consolidated_mode = os.getenv("CLAUDE_CONSOLIDATED_CALLS", "false").lower() == "true"
+        
+        # Batch mode: completions are queued into offline batches instead of sent one by one
+        self.batch_dispatcher = batch_dispatcher
+        
+        # Token usage per call site / investigation; max_tokens adapts to observed output lengths
+        self.token_budget = token_budget or TokenBudget(
+            adaptive=os.getenv("CLAUDE_ADAPTIVE_MAX_TOKENS", "true").lower() == "true"
+        )
+        # Approximate prompt tokens allowed for the findings list in master inference / decisions
+        self.evidence_token_budget = int(os.getenv("CLAUDE_EVIDENCE_TOKEN_BUDGET", "1500"))
+    
+    async def _create_message(self, **kwargs):
+        """Send a Messages API request through the scheduler"""
+        kwargs.setdefault("model", self.model)
+        return await self.scheduler.run(lambda: self.client.messages.create(**kwargs))
+    
+    async def _stream_message(self, on_delta: Callable[[str], None], **kwargs):
+        """Stream a Messages API response, passing each text delta to on_delta; returns the final message"""
+        kwargs.setdefault("model", self.model)
+        streamed = []
+        
+        async def stream_once():
+            async with self.client.messages.stream(**kwargs) as stream:
+                async for text in stream.text_stream:
+                    streamed.append(text)
+                    on_delta(text)
+                return await stream.get_final_message()
+        
+        # Retrying after text has reached on_delta would repeat it, so only retry before the first delta
+        return await self.scheduler.run(stream_once, can_retry=lambda: not streamed)
+    
+    def _record_usage(self, call_site: str, response):
+        usage = response.usage
+        self.token_budget.record(call_site, usage.input_tokens, usage.output_tokens,
+                                 truncated=response.stop_reason == "max_tokens")
+    
+    def _model_for(self, call_site: str) -> str:
+        tier = self.model_routes.get(call_site, "large")
+        if tier == "small":
+            return self.small_model
+        if tier == "large":
+            return self.model
+        return tier
+    
+    async def _complete(self, prompt: str, max_tokens: int, temperature: float,
+                        on_delta: Optional[Callable[[str], None]] = None, call_site: str = "completion",
+                        validate: Optional[Callable[[str], bool]] = None) -> str:
+        """Single-turn completion text from the model routed for call_site, cached when possible.
+        
+        max_tokens is the call site's ceiling; the request uses a smaller value once enough outputs
+        have been observed. When on_delta is given the completion is streamed to it as it arrives.
+        If validate rejects a small model's (non-streamed) answer, the large model is asked instead.
+        """
+        model = self._model_for(call_site)
+        content = await self._complete_with_model(model, prompt, max_tokens, temperature, on_delta, call_site)
+        if validate is None or on_delta or model == self.model or not self.escalate_on_parse_failure:
+            return content
+        if validate(content):
+            return content
+        
+        self.escalations += 1
+        print(f"[WARNING] {call_site}: {model} answer failed validation, escalating to {self.model}")
+        return await self._complete_with_model(self.model, prompt, max_tokens, temperature, None, call_site)
+    
+    async def _complete_with_model(self, model: str, prompt: str, max_tokens: int, temperature: float,
+                                   on_delta: Optional[Callable[[str], None]], call_site: str) -> str:
+        max_tokens = self.token_budget.max_tokens_for(call_site, max_tokens)
+        system = SYSTEM_PROMPT
+        cache_key = make_cache_key(model, temperature, max_tokens, prompt, system=system,
+                                   percent_bucket=self.cache_percent_bucket)
+        cached = await self.response_cache.get(cache_key)
+        if cached is not None:
+            self.token_budget.record_cache_hit(call_site)
+            if on_delta:
+                on_delta(cached)
+            return cached
+        
+        if self.batch_dispatcher is not None:
+            content = await self._batch_completion(cache_key, model, system, prompt, max_tokens, temperature, call_site)
+            if on_delta:
+                on_delta(content)
+            return content
+        
+        if on_delta:
+            response = await self._stream_message(
+                on_delta,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            self._record_usage(call_site, response)
+            content = response.content[0].text
+            await self.response_cache.set(cache_key, content)
+            return content
+        
+        async def request_completion() -> str:
+            response = await self._create_message(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            self._record_usage(call_site, response)
+            content = response.content[0].text
+            await self.response_cache.set(cache_key, content)
+            return content
+        
+        # Identical prompts already in flight share one request
+        return await self._completion_flights.do(cache_key, request_completion)
+    
+    async def _batch_completion(self, cache_key: str, model: str, system: str, prompt: str,
+                                max_tokens: int, temperature: float, call_site: str) -> str:
+        """Queue the completion on the batch dispatcher and wait for the batch to finish"""
+        async def request_completion() -> str:
+            content = await self.batch_dispatcher.complete({
+                "model": model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "system": system,
+                "messages": [{"role": "user", "content": prompt}]
+            })
+            # Batch results carry only text here, so usage is estimated
+            self.token_budget.record(call_site, estimate_tokens(prompt), estimate_tokens(content))
+            await self.response_cache.set(cache_key, content)
+            return content
+        
+        return await self._completion_flights.do(cache_key, request_completion)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Operational statistics for the Claude service"""
+        stats = {
+            "scheduler": self.scheduler.stats(),
+            "models": {
+                "large": self.model,
+                "small": self.small_model,
+                "routes": {call_site: self._model_for(call_site) for call_site in self.model_routes},
+                "escalations": self.escalations
+            },
+            "response_cache": {**self.response_cache.stats(), **self._completion_flights.stats()},
+            "token_budget": self.token_budget.stats()
+        }
+        if self.batch_dispatcher is not None:
+            stats["batch"] = self.batch_dispatcher.stats()
+        return stats
     
     def _parse_claude_json(self, content: str) -> Dict[str, Any]:
         """Robust JSON parsing for Claude responses"""
@@ -25,40 +252,22 @@ class ClaudeAIService:
             pass
         
         try:
-            # Clean control characters except newlines and tabs
-            cleaned_content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
-            
-            # Try to extract JSON from markdown code blocks
-            json_patterns = [
-                r'```json\s*(\{.*?\})\s*```',
-                r'```\s*(\{.*?\})\s*```',
-                r'(\{[^{}]*\{[^{}]*\}[^{}]*\})',  # Nested JSON
-                r'(\{[^{}]+\})'  # Simple JSON
-            ]
+            # Single pass for the first balanced object (code fences, surrounding prose, raw newlines)
+            result = extract_json_object(content)
+            if result is not None:
+                return result
             
-            for pattern in json_patterns:
-                matches = re.findall(pattern, cleaned_content, re.DOTALL)
-                if matches:
-                    json_str = matches[0].strip()
-                    try:
-                        return json.loads(json_str)
-                    except json.JSONDecodeError:
-                        continue
+            # Response cut off mid-object (e.g. at max_tokens): keep the members that did arrive
+            result = parse_partial_json(content)
+            if result:
+                return result
             
             # If all else fails, try to manually extract key-value pairs
+            cleaned_content = CONTROL_CHARS.sub('', content)
             result = {}
-            key_patterns = [
-                r'"executive_summary":\s*"([^"]*)"',
-                r'"primary_cause":\s*"([^"]*)"',
-                r'"detailed_reasoning":\s*"([^"]*)"',
-                r'"confidence_score":\s*([0-9.]+)',
-                r'"cause_confidence":\s*([0-9.]+)'
-            ]
-            
-            for i, pattern in enumerate(key_patterns):
-                match = re.search(pattern, cleaned_content)
+            for key, pattern in JSON_KEY_PATTERNS:
+                match = pattern.search(cleaned_content)
                 if match:
-                    key = ["executive_summary", "primary_cause", "detailed_reasoning", "confidence_score", "cause_confidence"][i]
                     value = match.group(1)
                     if key in ["confidence_score", "cause_confidence"]:
                         result[key] = float(value)
@@ -75,66 +284,124 @@ class ClaudeAIService:
             print(f"Content preview: {content[:200]}...")
             raise
     
-    async def analyze_price_movement(self, stock_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
-        """Use Claude to analyze price movement based purely on data - no preset categories"""
-        
+    def _price_movement_prompt(self, stock_data: Dict[str, Any], symbol: str) -> str:
         price_change = stock_data.get("price_change_percent", 0)
         current_price = stock_data.get("current_price", 0)
         volume = stock_data.get("volume", 0)
         
-        prompt = f"""You are analyzing {symbol} stock movement. Here's what happened:
+        return f"""You are analyzing {symbol} stock movement. Here's what happened:
 
 PRICE MOVEMENT: {price_change:.2f}%
 CURRENT PRICE: ${current_price:.2f}
 VOLUME: {volume:,}
 
-Based ONLY on this price and volume data, explain what you observe. Don't categorize or use preset frameworks. Just analyze what this specific movement and volume pattern tells you about what might have happened.
+Based ONLY on this price and volume data, explain what you observe: what this specific movement and volume pattern tells you about what might have happened.
 
 Respond with your raw analysis - no JSON format, no categories, just your reasoning about what this data suggests."""
+    
+    def _price_movement_fallback(self, stock_data: Dict[str, Any]) -> Dict[str, Any]:
+        price_change = stock_data.get("price_change_percent", 0)
+        volume = stock_data.get("volume", 0)
+        return {"raw_analysis": f"Price moved {price_change:.2f}% with volume of {volume:,}. Analysis requires investigation of underlying factors."}
+    
+    async def analyze_price_movement(self, stock_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        """Use Claude to analyze price movement based purely on data - no preset categories"""
+        
+        prompt = self._price_movement_prompt(stock_data, symbol)
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=800,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = response.content[0].text
+            content = await self._complete(prompt, max_tokens=800, temperature=0.1, call_site="price_movement")
             return {"raw_analysis": content.strip()}
             
         except Exception as e:
             print(f"Error in Claude price movement analysis: {e}")
-            return {"raw_analysis": f"Price moved {price_change:.2f}% with volume of {volume:,}. Analysis requires investigation of underlying factors."}
+            return self._price_movement_fallback(stock_data)
     
-    async def analyze_news_sentiment(self, symbol: str, news_articles: List[Dict], price_change: float) -> Dict[str, Any]:
-        """Free-form news analysis based purely on headlines and price movement"""
-        
+    def _news_sentiment_prompt(self, symbol: str, news_articles: List[Dict], price_change: float) -> str:
         headlines = [article.get("headline", "") for article in news_articles[:5]]
         
-        prompt = f"""Look at these news headlines about {symbol} and the {price_change:.2f}% price movement:
+        return f"""Look at these news headlines about {symbol} and the {price_change:.2f}% price movement:
 
 HEADLINES:
 {chr(10).join([f"- {headline}" for headline in headlines])}
 
 PRICE MOVEMENT: {price_change:.2f}%
 
-Just read these headlines and tell me what story they're telling. What themes do you see? How do they relate to the price movement? Don't score or categorize - just analyze what the news is actually saying and whether it connects to the price action."""
+Just read these headlines and tell me what story they're telling. What themes do you see? How do they relate to the price movement? Analyze what the news is actually saying and whether it connects to the price action."""
+    
+    def _news_sentiment_fallback(self, news_articles: List[Dict], price_change: float) -> Dict[str, Any]:
+        headline_count = len(news_articles[:5])
+        return {"news_analysis": f"News analysis unavailable. {headline_count} headlines reviewed relating to {price_change:.2f}% movement."}
+    
+    async def analyze_news_sentiment(self, symbol: str, news_articles: List[Dict], price_change: float) -> Dict[str, Any]:
+        """Free-form news analysis based purely on headlines and price movement"""
+        
+        prompt = self._news_sentiment_prompt(symbol, news_articles, price_change)
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=800,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = response.content[0].text
+            content = await self._complete(prompt, max_tokens=800, temperature=0.1, call_site="news_sentiment")
             return {"news_analysis": content.strip()}
             
         except Exception as e:
             print(f"Error in Claude news analysis: {e}")
-            return {"news_analysis": f"News analysis unavailable. {len(headlines)} headlines reviewed relating to {price_change:.2f}% movement."}
+            return self._news_sentiment_fallback(news_articles, price_change)
+    
+    async def analyze_investigation_bundle(self, symbol: str, stock_data: Dict[str, Any],
+                                           news_articles: List[Dict], price_change: float) -> Dict[str, Dict[str, Any]]:
+        """Consolidated mode: price movement and news sentiment analysis in one Claude round trip.
+        
+        Returns {"price_movement": <analyze_price_movement result>, "news_sentiment": <analyze_news_sentiment result>}.
+        Sections missing from the combined answer fall back to their individual call.
+        """
+        sections = {
+            "PRICE_MOVEMENT": self._price_movement_prompt(stock_data, symbol),
+            "NEWS_SENTIMENT": self._news_sentiment_prompt(symbol, news_articles, price_change)
+        }
+        
+        try:
+            answers = await self._complete_sections(symbol, sections, max_tokens=1600, temperature=0.1)
+        except Exception as e:
+            print(f"Error in Claude consolidated analysis: {e}")
+            answers = {}
+        
+        if "PRICE_MOVEMENT" in answers:
+            price_result = {"raw_analysis": answers["PRICE_MOVEMENT"]}
+        else:
+            price_result = await self.analyze_price_movement(stock_data, symbol)
+        if "NEWS_SENTIMENT" in answers:
+            news_result = {"news_analysis": answers["NEWS_SENTIMENT"]}
+        else:
+            news_result = await self.analyze_news_sentiment(symbol, news_articles, price_change)
+        
+        return {"price_movement": price_result, "news_sentiment": news_result}
+    
+    async def _complete_sections(self, symbol: str, sections: Dict[str, str], max_tokens: int,
+                                 temperature: float) -> Dict[str, str]:
+        """Ask several independent questions in one completion and split the answer by section header"""
+        tasks = "\n\n".join(f"### TASK {name}\n{prompt}" for name, prompt in sections.items())
+        headers = "\n".join(f"=== {name} ===\n<your answer to TASK {name}>" for name in sections)
+        prompt = f"""You have {len(sections)} separate analysis tasks about {symbol}. Answer each one independently.
+
+{tasks}
+
+Write every answer under its own header line, exactly as shown below and in the same order, with nothing before the first header:
+{headers}"""
+        
+        content = await self._complete(
+            prompt, max_tokens=max_tokens, temperature=temperature, call_site="investigation_bundle",
+            validate=lambda text: len(self._split_sections(text, sections)) == len(sections)
+        )
+        return self._split_sections(content, sections)
+    
+    def _split_sections(self, content: str, sections: Dict[str, str]) -> Dict[str, str]:
+        answers = {}
+        headers = list(SECTION_HEADER.finditer(content))
+        for index, match in enumerate(headers):
+            body_end = headers[index + 1].start() if index + 1 < len(headers) else len(content)
+            body = content[match.end():body_end].strip()
+            if match.group(1) in sections and body:
+                answers[match.group(1)] = body
+        return answers
     
     async def analyze_earnings_impact(self, symbol: str, earnings_data: Dict[str, Any], price_change: float) -> Dict[str, Any]:
         """Free-form earnings analysis without preset categories"""
@@ -149,17 +416,10 @@ EARNINGS DATA:
 
 PRICE MOVEMENT: {price_change:.2f}%
 
-Just analyze what this earnings performance tells you. Did they beat, miss, or meet expectations? What does that mean for the business? How does the price reaction make sense given these numbers? Think through it step by step."""
+Just analyze what this earnings performance tells you. Did they beat, miss, or meet expectations? What does that mean for the business? How does the price reaction make sense given these numbers?"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=800,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = response.content[0].text
+            content = await self._complete(prompt, max_tokens=800, temperature=0.1, call_site="earnings_impact")
             return {"earnings_analysis": content.strip()}
             
         except Exception as e:
@@ -168,14 +428,16 @@ Just analyze what this earnings performance tells you. Did they beat, miss, or m
     
     async def generate_master_inference(self, symbol: str, all_findings: List[str], 
                                       price_data: Dict[str, Any], 
-                                      investigation_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Pure reasoning analysis - no preset formats or categories"""
+                                      investigation_data: Dict[str, Any],
+                                      on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Pure reasoning analysis - no preset formats or categories (streamed to on_delta if given)"""
         
         price_change = price_data.get("price_change_percent", 0)
         start_price = price_data.get("start_price", 0)
         end_price = price_data.get("end_price", 0)
         
-        findings_text = "\n".join([f"- {finding}" for finding in all_findings])
+        findings = self.token_budget.fit_evidence(all_findings, self.evidence_token_budget)
+        findings_text = "\n".join([f"- {finding}" for finding in findings])
         
         prompt = f"""You've investigated why {symbol} moved {price_change:.2f}% from ${start_price:.2f} to ${end_price:.2f}.
 
@@ -185,23 +447,17 @@ Here's what your investigation found:
 Additional data from investigation:
 {json.dumps(investigation_data, indent=2) if investigation_data else "No additional structured data"}
 
-Now think through this step by step:
+Now answer:
 1. What actually happened to cause this price movement?
 2. What's the most logical explanation based on ALL the evidence?
 3. Why did investors react this way?
 4. What does this mean going forward?
 
-Don't use any preset categories or frameworks. Just reason through the evidence and explain what really happened. Be specific about the cause and confident in your conclusion."""
+Reason through the evidence and be confident in your conclusion."""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1200,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = response.content[0].text
+            content = await self._complete(prompt, max_tokens=1200, temperature=0.1, on_delta=on_delta,
+                                           call_site="master_inference")
             return {"comprehensive_analysis": content.strip()}
             
         except Exception as e:
@@ -211,7 +467,8 @@ Don't use any preset categories or frameworks. Just reason through the evidence
     async def generate_investigation_decision(self, current_findings: List[str], symbol: str) -> Dict[str, Any]:
         """AI decides what to investigate next based on current findings"""
         
-        findings_text = "\n".join([f"- {finding}" for finding in current_findings])
+        findings = self.token_budget.fit_evidence(current_findings, self.evidence_token_budget)
+        findings_text = "\n".join([f"- {finding}" for finding in findings])
         
         prompt = f"""You're investigating {symbol}. Here's what you've found so far:
 
@@ -222,14 +479,7 @@ Based on these findings, what should you investigate next to get to the bottom o
 Think like a detective - what leads should you follow up on?"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=600,
-                temperature=0.2,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = response.content[0].text
+            content = await self._complete(prompt, max_tokens=600, temperature=0.2, call_site="investigation_decision")
             return {"investigation_reasoning": content.strip()}
             
         except Exception as e:
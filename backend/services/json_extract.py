@@ -0,0 +1,122 @@
+"""
+Linear-time JSON object extraction from free-form LLM output
+"""
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# Inside an object: a whole string literal (escapes honoured, possibly unterminated) or a structural char.
+# The string pattern is the unrolled-loop form, so matching is linear and never backtracks.
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z)'
+_OBJECT_TOKEN = re.compile(_STRING + r'|[{}]', re.DOTALL)
+_PARTIAL_TOKEN = re.compile(_STRING + r'|[{}\[\],:]', re.DOTALL)
+
+# strict=False accepts raw newlines/tabs inside strings, which Claude emits regularly
+_DECODER = json.JSONDecoder(strict=False)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def find_json_span(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """(begin, end) of the first balanced {...} at or after `start`, or None if it never closes"""
+    begin = text.find("{", start)
+    if begin == -1:
+        return None
+
+    depth = 0
+    for match in _OBJECT_TOKEN.finditer(text, begin):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                return begin, match.end()
+    return None
+
+
+def extract_json_object(text: str, max_attempts: int = 8) -> Optional[Dict[str, Any]]:
+    """First decodable JSON object embedded in text (code fences, prose, raw newlines in strings).
+
+    Each candidate "{" is decoded in one C-level pass; a candidate that is not valid JSON
+    (e.g. "{placeholder}" in prose) moves the search to the next brace, up to max_attempts.
+    """
+    position = text.find("{")
+    for _ in range(max_attempts):
+        if position == -1:
+            return None
+        try:
+            value, _ = _DECODER.raw_decode(text, position)
+            if isinstance(value, dict):
+                return value
+        except RecursionError:
+            # Nested deeper than the decoder can handle; nothing usable here
+            return None
+        except json.JSONDecodeError:
+            # A JSON-looking object that never closes was cut off; don't return one of its children
+            if text[position + 1:position + 64].lstrip()[:1] in ('"', "}") and find_json_span(text, position) is None:
+                return None
+        position = text.find("{", position + 1)
+    return None
+
+
+def parse_partial_json(text: str) -> Optional[Dict[str, Any]]:
+    """Best-effort parse of a JSON object that may be cut off (streaming or max_tokens truncation).
+
+    Complete members are kept, an unterminated string value is closed where it stops, and any
+    incomplete trailing member is dropped. Returns None when no object has started yet.
+    """
+    begin = text.find("{")
+    if begin == -1:
+        return None
+
+    # Every token that changes the stack also moves the safe point, so the stack at the safe point is
+    # always the current one and never needs copying
+    stack = []
+    safe_end = begin
+    open_string = None
+    previous = None
+    for match in _PARTIAL_TOKEN.finditer(text, begin):
+        token = match.group()
+        if token in _CLOSERS:
+            stack.append(_CLOSERS[token])
+            safe_end = match.end()
+        elif token in ("}", "]"):
+            if not stack or stack.pop() != token:
+                break
+            if not stack:
+                return _loads_object(text[begin:match.end()])
+            safe_end = match.end()
+        elif token == ",":
+            # Everything before a separator is a complete member or element
+            safe_end = match.start()
+        elif token[0] == '"' and (len(token) == 1 or not _is_closed_string(token)):
+            # Only a string value (after ":" or inside an array) can be closed early
+            if previous == ":" or (previous in ("[", ",") and stack and stack[-1] == "]"):
+                open_string = (match.start(), token.rstrip("\\"))
+            break
+        previous = token if len(token) == 1 else '"'
+
+    closers = "".join(reversed(stack))
+    if open_string is not None:
+        string_start, token = open_string
+        value = _loads_object(text[begin:string_start] + token + '"' + closers)
+        if value is not None:
+            return value
+    return _loads_object(text[begin:safe_end].rstrip().rstrip(",") + closers)
+
+
+def _is_closed_string(token: str) -> bool:
+    if len(token) < 2 or token[-1] != '"':
+        return False
+    # A closing quote is preceded by an even number of backslashes
+    backslashes = len(token) - 1 - len(token[:-1].rstrip("\\"))
+    return backslashes % 2 == 0
+
+
+def _loads_object(candidate: str) -> Optional[Dict[str, Any]]:
+    try:
+        value = _DECODER.decode(candidate)
+    except (json.JSONDecodeError, RecursionError):
+        return None
+    return value if isinstance(value, dict) else None
@@ -0,0 +1,189 @@
+"""
+Offline batch execution for Claude requests (Message Batches style submit / poll / collect)
+"""
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+
+class BatchBackend(ABC):
+    """Submits a list of Messages API requests as one batch and hands back per-request results"""
+
+    @abstractmethod
+    async def submit(self, requests: List[Dict[str, Any]]) -> str:
+        """Submit [{"custom_id": ..., "params": {...messages.create kwargs...}}]; returns a batch id"""
+
+    @abstractmethod
+    async def is_complete(self, batch_id: str) -> bool:
+        """Whether the batch has finished processing"""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """Map of custom_id -> {"text": ...} or {"error": ...}"""
+
+
+class LocalBatchBackend(BatchBackend):
+    """In-process stand-in that runs each request through `create_message` (used for tests and local runs)"""
+
+    def __init__(self, create_message: Callable[..., Awaitable[Any]], concurrency: int = 4):
+        self.create_message = create_message
+        self.concurrency = concurrency
+        self._batches: Dict[str, asyncio.Task] = {}
+
+    async def submit(self, requests: List[Dict[str, Any]]) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = asyncio.ensure_future(self._process(requests))
+        return batch_id
+
+    async def _process(self, requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        async def run(request: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    response = await self.create_message(**request["params"])
+                    results[request["custom_id"]] = {"text": response.content[0].text}
+                except Exception as e:
+                    results[request["custom_id"]] = {"error": str(e)}
+
+        await asyncio.gather(*[run(request) for request in requests])
+        return results
+
+    async def is_complete(self, batch_id: str) -> bool:
+        return self._batches[batch_id].done()
+
+    async def results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        return await self._batches.pop(batch_id)
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API over HTTP (the pinned SDK predates batch support)"""
+
+    BASE_URL = "https://api.anthropic.com/v1/messages/batches"
+
+    def __init__(self, api_key: str, anthropic_version: str = "2023-06-01",
+                 beta: Optional[str] = "message-batches-2024-09-24"):
+        headers = {"x-api-key": api_key, "anthropic-version": anthropic_version, "content-type": "application/json"}
+        if beta:
+            headers["anthropic-beta"] = beta
+        self._client = httpx.AsyncClient(headers=headers, timeout=60.0)
+        self._results_urls: Dict[str, str] = {}
+
+    async def submit(self, requests: List[Dict[str, Any]]) -> str:
+        response = await self._client.post(self.BASE_URL, json={"requests": requests})
+        response.raise_for_status()
+        return response.json()["id"]
+
+    async def is_complete(self, batch_id: str) -> bool:
+        response = await self._client.get(f"{self.BASE_URL}/{batch_id}")
+        response.raise_for_status()
+        batch = response.json()
+        if batch.get("processing_status") != "ended":
+            return False
+        self._results_urls[batch_id] = batch["results_url"]
+        return True
+
+    async def results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        response = await self._client.get(self._results_urls.pop(batch_id))
+        response.raise_for_status()
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            result = entry.get("result", {})
+            if result.get("type") == "succeeded":
+                blocks = result["message"].get("content", [])
+                results[entry["custom_id"]] = {"text": "".join(b.get("text", "") for b in blocks if b.get("type") == "text")}
+            else:
+                results[entry["custom_id"]] = {"error": json.dumps(result.get("error") or result.get("type"))}
+        return results
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class BatchDispatcher:
+    """Collects individual completion requests into batches; each caller awaits only its own result.
+
+    Requests are flushed when max_batch_size is reached or flush_interval seconds after the first one
+    was queued, so investigations running concurrently end up sharing a batch.
+    """
+
+    def __init__(self, backend: BatchBackend, max_batch_size: int = 1000, flush_interval: float = 2.0,
+                 poll_interval: float = 10.0):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self._pending: List[tuple] = []  # (custom_id, params, future)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+
+    async def complete(self, params: Dict[str, Any]) -> str:
+        """Queue one messages.create request and wait for its text from the batch"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((f"req_{uuid.uuid4().hex}", params, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self.flush)
+        return await future
+
+    def flush(self):
+        """Submit everything queued so far as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        items, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run_batch(items))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, items: List[tuple]):
+        futures = {custom_id: future for custom_id, _, future in items}
+        try:
+            batch_id = await self.backend.submit([
+                {"custom_id": custom_id, "params": params} for custom_id, params, _ in items
+            ])
+            self.batches_submitted += 1
+            self.requests_submitted += len(items)
+            print(f"[INFO] Submitted Claude batch {batch_id} with {len(items)} requests")
+
+            while not await self.backend.is_complete(batch_id):
+                await asyncio.sleep(self.poll_interval)
+            results = await self.backend.results(batch_id)
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Resolve each waiting caller so its investigation pipeline resumes
+        for custom_id, future in futures.items():
+            if future.done():
+                continue
+            result = results.get(custom_id, {"error": "missing from batch results"})
+            if "text" in result:
+                future.set_result(result["text"])
+            else:
+                future.set_exception(RuntimeError(f"Batch request failed: {result['error']}"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_requests": len(self._pending),
+            "running_batches": len(self._running),
+            "batches_submitted": self.batches_submitted,
+            "requests_submitted": self.requests_submitted
+        }
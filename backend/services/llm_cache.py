@@ -0,0 +1,124 @@
+"""
+LLM response cache: in-memory LRU with an optional SQLite tier
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from services.ttl_cache import TTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+_PERCENT = re.compile(r"(-?\d+(?:\.\d+)?)%")
+
+
+def normalize_prompt(prompt: str, percent_bucket: Optional[float] = None) -> str:
+    """Canonical prompt text for cache keys.
+
+    Collapses whitespace and, when percent_bucket is set, rounds every "<number>%" to the nearest
+    bucket so near-identical moves (e.g. 2.31% and 2.44% with a 0.5 bucket) share a cache entry.
+    """
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    if percent_bucket:
+        normalized = _PERCENT.sub(
+            lambda match: f"{round(float(match.group(1)) / percent_bucket) * percent_bucket:.2f}%",
+            normalized
+        )
+    return normalized
+
+
+def make_cache_key(model: str, temperature: float, max_tokens: int, prompt: str,
+                   system: Optional[str] = None, percent_bucket: Optional[float] = None) -> str:
+    payload = json.dumps({
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "system": normalize_prompt(system) if system else None,
+        "prompt": normalize_prompt(prompt, percent_bucket)
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Completion text keyed by make_cache_key(); memory first, then SQLite if configured"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 900.0, sqlite_path: Optional[str] = None,
+                 max_rows: int = 10000):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.sqlite_path = sqlite_path
+        self.sqlite_hits = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        if sqlite_path:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_responses (
+                        key TEXT PRIMARY KEY,
+                        response TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_llm_responses_expires_at ON llm_responses (expires_at)"
+                )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is not None or self._conn is None:
+            return value
+
+        value = await asyncio.to_thread(self._sqlite_get, key)
+        if value is not None:
+            self.sqlite_hits += 1
+            self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: str):
+        if not self.enabled:
+            return
+        self.memory.set(key, value)
+        if self._conn is not None:
+            await asyncio.to_thread(self._sqlite_set, key, value)
+
+    def _sqlite_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _sqlite_set(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl)
+            )
+            # Opportunistically drop expired rows, then the soonest-expiring ones beyond max_rows
+            self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),))
+            if self.max_rows > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN ("
+                    "SELECT key FROM llm_responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.memory.stats(), "sqlite_path": self.sqlite_path, "sqlite_max_rows": self.max_rows,
+                "sqlite_hits": self.sqlite_hits}
@@ -0,0 +1,171 @@
+"""
+Central scheduler for Claude requests: global and per-tenant concurrency, priority lanes and
+rate-limit aware retries
+"""
+import asyncio
+import contextvars
+import itertools
+import random
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Lower value is served first
+PRIORITY_LANES = {"interactive": 0, "batch": 1, "demo": 2}
+
+# Lane and tenant for requests made from the current task; set at the entry point (API request, batch job)
+request_priority: contextvars.ContextVar[str] = contextvars.ContextVar("request_priority", default="interactive")
+request_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("request_tenant", default="default")
+
+# HTTP statuses worth retrying after a pause: rate limited and API overloaded
+RETRYABLE_STATUS = {429, 529}
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds to wait according to a retryable API error's headers, None if the error is not retryable"""
+    status = getattr(error, "status_code", None)
+    if status not in RETRYABLE_STATUS:
+        return None
+    response = getattr(error, "response", None)
+    headers = response.headers if response is not None else {}
+    for header in ("retry-after", "x-ratelimit-reset-after"):
+        value = headers.get(header)
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                continue
+    return 0.0
+
+
+class LLMScheduler:
+    """Grants request slots by priority lane, then arrival order, within global and per-tenant limits"""
+
+    def __init__(self, max_concurrency: int = 8, per_tenant_concurrency: Optional[int] = None,
+                 max_retries: int = 3, base_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.per_tenant_concurrency = per_tenant_concurrency or max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.active = 0
+        self.tenant_active: Dict[str, int] = defaultdict(int)
+        self._waiting: List[list] = []  # [lane, sequence, tenant, future]
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._resume_handle: Optional[asyncio.TimerHandle] = None
+
+        self.granted: Dict[str, int] = defaultdict(int)
+        self.retries = 0
+        self.rate_limited = 0
+
+    async def run(self, call: Callable[[], Awaitable[T]], priority: Optional[str] = None,
+                  tenant: Optional[str] = None, can_retry: Optional[Callable[[], bool]] = None) -> T:
+        """Run call() in a slot, retrying rate-limit / overload errors with backoff and jitter.
+
+        can_retry lets the caller veto a retry (e.g. once a streamed response has started).
+        """
+        priority = priority or request_priority.get()
+        tenant = tenant or request_tenant.get()
+        attempt = 0
+        while True:
+            async with self.slot(priority, tenant):
+                try:
+                    return await call()
+                except Exception as e:
+                    retry_after = retry_after_seconds(e)
+                    if retry_after is None or attempt >= self.max_retries or (can_retry and not can_retry()):
+                        raise
+                    self.rate_limited += 1
+                    delay = max(retry_after, self._backoff(attempt))
+                    # The quota is shared by everyone, so hold back all lanes, not just this caller
+                    self.pause(delay)
+            attempt += 1
+            self.retries += 1
+            print(f"[WARNING] Claude rate limited, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform between 0 and the exponential cap
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "interactive", tenant: str = "default"):
+        await self._acquire(priority, tenant)
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    async def _acquire(self, priority: str, tenant: str):
+        future = asyncio.get_running_loop().create_future()
+        entry = [PRIORITY_LANES.get(priority, len(PRIORITY_LANES)), next(self._sequence), tenant, future]
+        self._waiting.append(entry)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the waiter was cancelled; hand it on
+                self._release(tenant)
+            elif entry in self._waiting:
+                self._waiting.remove(entry)
+            raise
+
+    def _release(self, tenant: str):
+        self.active -= 1
+        self.tenant_active[tenant] -= 1
+        if not self.tenant_active[tenant]:
+            del self.tenant_active[tenant]
+        self._dispatch()
+
+    def _dispatch(self):
+        wait = self._paused_until - time.monotonic()
+        if wait > 0:
+            if self._resume_handle is None:
+                self._resume_handle = asyncio.get_running_loop().call_later(wait, self._resume)
+            return
+
+        self._waiting.sort(key=lambda entry: (entry[0], entry[1]))
+        for entry in list(self._waiting):
+            if self.active >= self.max_concurrency:
+                break
+            lane, _, tenant, future = entry
+            if self.tenant_active[tenant] >= self.per_tenant_concurrency:
+                continue
+            self._waiting.remove(entry)
+            if future.done():
+                continue
+            self.active += 1
+            self.tenant_active[tenant] += 1
+            self.granted[lane] += 1
+            future.set_result(None)
+
+    def _resume(self):
+        self._resume_handle = None
+        self._dispatch()
+
+    def pause(self, seconds: float):
+        """Stop granting new slots for `seconds` (requests already running are unaffected)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        lanes = {value: name for name, value in PRIORITY_LANES.items()}
+        waiting: Dict[str, int] = defaultdict(int)
+        for lane, _, _, _ in self._waiting:
+            waiting[lanes.get(lane, "other")] += 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_tenant_concurrency": self.per_tenant_concurrency,
+            "active": self.active,
+            "active_by_tenant": dict(self.tenant_active),
+            "waiting_by_lane": dict(waiting),
+            "granted_by_lane": {lanes.get(lane, "other"): count for lane, count in self.granted.items()},
+            "paused_for_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries
+        }
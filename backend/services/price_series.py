@@ -0,0 +1,129 @@
+"""
+Columnar OHLCV price series backed by contiguous NumPy arrays
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+DateLike = Union[str, np.datetime64]
+
+ALPHA_VANTAGE_FIELDS = ("1. open", "2. high", "3. low", "4. close", "5. volume")
+
+
+class PriceSeries:
+    """OHLCV bars for one symbol, stored oldest to newest as parallel NumPy arrays"""
+
+    __slots__ = ("symbol", "dates", "open", "high", "low", "close", "volume", "source")
+
+    def __init__(self, symbol: str, dates: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray, source: str = "unknown"):
+        self.symbol = symbol
+        self.dates = np.asarray(dates, dtype="datetime64")
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.int64)
+        self.source = source
+
+    @classmethod
+    def empty(cls, symbol: str, source: str = "unknown") -> "PriceSeries":
+        return cls(symbol, np.array([], dtype="datetime64[D]"), [], [], [], [], [], source)
+
+    @classmethod
+    def from_alpha_vantage(cls, symbol: str, time_series: Dict[str, Dict[str, str]],
+                           limit: Optional[int] = None) -> "PriceSeries":
+        """Parse a TIME_SERIES_DAILY payload ("Time Series (Daily)" mapping) in one vectorized pass"""
+        items = list(time_series.items())
+        if limit is not None:
+            # Alpha Vantage returns newest first, so the first `limit` entries are the latest bars
+            items = items[:limit]
+        if not items:
+            return cls.empty(symbol, "alpha_vantage")
+
+        dates = np.array([date_str for date_str, _ in items], dtype="datetime64[D]")
+        raw = np.array([[values[field] for field in ALPHA_VANTAGE_FIELDS] for _, values in items])
+        values = raw.astype(np.float64)
+        return cls._sorted(symbol, dates, values[:, 0], values[:, 1], values[:, 2], values[:, 3],
+                           values[:, 4].astype(np.int64), "alpha_vantage")
+
+    @classmethod
+    def from_records(cls, symbol: str, records: Sequence[Dict[str, Any]], source: str = "unknown") -> "PriceSeries":
+        """Build a series from the list-of-dicts API shape (any date order)"""
+        if not records:
+            return cls.empty(symbol, source)
+        return cls.from_columns(
+            symbol,
+            [record["date"] for record in records],
+            [record["open"] for record in records],
+            [record["high"] for record in records],
+            [record["low"] for record in records],
+            [record["close"] for record in records],
+            [record["volume"] for record in records],
+            source
+        )
+
+    @classmethod
+    def from_columns(cls, symbol: str, dates: Iterable, open: Iterable, high: Iterable, low: Iterable,
+                     close: Iterable, volume: Iterable, source: str = "unknown") -> "PriceSeries":
+        """Build a series from column sequences (any date order)"""
+        return cls._sorted(symbol, np.array(list(dates), dtype="datetime64"), np.array(list(open)),
+                           np.array(list(high)), np.array(list(low)), np.array(list(close)),
+                           np.array(list(volume)), source)
+
+    @classmethod
+    def _sorted(cls, symbol, dates, open, high, low, close, volume, source) -> "PriceSeries":
+        order = np.argsort(dates, kind="stable")
+        if len(order) and not np.array_equal(order, np.arange(len(order))):
+            return cls(symbol, dates[order], open[order], high[order], low[order], close[order], volume[order], source)
+        return cls(symbol, dates, open, high, low, close, volume, source)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index) -> "PriceSeries":
+        """Positional slicing, e.g. series[-30:]"""
+        if not isinstance(index, slice):
+            index = slice(index, index + 1 if index != -1 else None)
+        return PriceSeries(self.symbol, self.dates[index], self.open[index], self.high[index],
+                           self.low[index], self.close[index], self.volume[index], self.source)
+
+    def between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> "PriceSeries":
+        """Bars with start <= date <= end (inclusive, either bound optional)"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, "D"), side="left"))
+        if end is None:
+            hi = len(self.dates)
+        else:
+            # Include every intraday bar on the end date as well
+            hi = int(np.searchsorted(self.dates, np.datetime64(end, "D") + np.timedelta64(1, "D"), side="left"))
+        return self[lo:hi]
+
+    def tail(self, count: int) -> "PriceSeries":
+        """The latest `count` bars"""
+        return self[max(len(self) - count, 0):]
+
+    def date_strings(self) -> List[str]:
+        unit = np.datetime_data(self.dates.dtype)[0]
+        return np.datetime_as_string(self.dates, unit="D" if unit in ("D", "generic") else "m").tolist()
+
+    def to_records(self, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """The existing list-of-dicts API shape (newest bar first, like the provider responses)"""
+        columns = (self.date_strings(), self.open.tolist(), self.high.tolist(), self.low.tolist(),
+                   self.close.tolist(), self.volume.tolist())
+        records = [
+            {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(*columns)
+        ]
+        if newest_first:
+            records.reverse()
+        return records
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ("dates", "open", "high", "low", "close", "volume"))
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return f"PriceSeries({self.symbol!r}, empty, source={self.source!r})"
+        return (f"PriceSeries({self.symbol!r}, {len(self)} bars, "
+                f"{self.dates[0]}..{self.dates[-1]}, source={self.source!r})")
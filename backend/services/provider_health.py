@@ -0,0 +1,109 @@
+"""
+Per-provider health tracking with a circuit breaker
+"""
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Rolling error rate, latency percentiles and breaker state for one upstream provider"""
+
+    def __init__(self, name: str, window_size: int = 50, failure_threshold: float = 0.5,
+                 min_requests: int = 4, open_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self._outcomes = deque(maxlen=window_size)  # (succeeded, latency_seconds)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    def _cooldown_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.open_seconds
+
+    def is_available(self) -> bool:
+        """Whether a request may be sent now (read-only, does not reserve the half-open probe)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._cooldown_elapsed()
+        return not self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Admit a request; an open breaker lets a single probe through once its cooldown has elapsed"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self._cooldown_elapsed():
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency: float):
+        if self.state == HALF_OPEN:
+            # Probe succeeded - close the breaker and start from a clean window
+            self._outcomes.clear()
+            self.state = CLOSED
+            self._probe_in_flight = False
+        self._outcomes.append((True, latency))
+
+    def record_failure(self, latency: float):
+        self._outcomes.append((False, latency))
+        if self.state == HALF_OPEN:
+            self._trip()
+        elif self.state == CLOSED and len(self._outcomes) >= self.min_requests \
+                and self.error_rate >= self.failure_threshold:
+            self._trip()
+
+    def release_probe(self):
+        """Give back a half-open probe slot whose request was cancelled before completing"""
+        self._probe_in_flight = False
+
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        print(f"[WARNING] Circuit breaker opened for {self.name}")
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for succeeded, _ in self._outcomes if not succeeded) / len(self._outcomes)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Latency percentile in seconds over successful requests in the window"""
+        latencies = sorted(latency for succeeded, latency in self._outcomes if succeeded)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def expected_cost(self) -> float:
+        """Ranking score: typical latency inflated by the failure rate (lower is better)"""
+        p50 = self.latency_percentile(50)
+        if p50 is None:
+            return float("inf")
+        return p50 / max(1.0 - self.error_rate, 0.1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            "state": self.state,
+            "requests_in_window": len(self._outcomes),
+            "error_rate": round(self.error_rate, 4),
+            "p50_latency_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "times_opened": self.times_opened
+        }
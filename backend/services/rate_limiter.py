@@ -0,0 +1,141 @@
+"""
+Async token-bucket rate limiting for upstream provider quotas
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+
+class QuotaExhausted(Exception):
+    """Raised when a provider's quota cannot be satisfied before the caller's deadline"""
+
+    def __init__(self, provider: str, retry_after: Optional[float] = None):
+        self.provider = provider
+        self.retry_after = retry_after
+        message = f"{provider} quota exhausted"
+        if retry_after:
+            message += f" (retry in {retry_after:.1f}s)"
+        super().__init__(message)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`; waiters are served in FIFO order"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.granted = 0
+        self.rejected = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _seconds_until_available(self, tokens: float, now: float) -> float:
+        blocked = max(self._blocked_until - now, 0.0)
+        missing = max(tokens - self.tokens, 0.0)
+        return max(blocked, missing / self.rate if self.rate > 0 else float("inf"))
+
+    async def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Take tokens, waiting at most `timeout` seconds; returns False if the deadline cannot be met"""
+        # Fast path: nobody is queued and a token is ready, so take it without waiting (works for timeout=0)
+        if not self._lock.locked():
+            now = time.monotonic()
+            self._refill(now)
+            if self._seconds_until_available(tokens, now) <= 0:
+                self.tokens -= tokens
+                self.granted += 1
+                return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.waiting += 1
+        try:
+            # The lock queues waiters FIFO; a waiter whose deadline passes in the queue gives up
+            try:
+                if deadline is None:
+                    await self._lock.acquire()
+                else:
+                    await asyncio.wait_for(self._lock.acquire(), max(deadline - time.monotonic(), 0.0))
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+
+            try:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._seconds_until_available(tokens, now)
+                if deadline is not None and now + wait > deadline:
+                    # Fail fast instead of sleeping past the deadline
+                    self.rejected += 1
+                    return False
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    self._refill(time.monotonic())
+                self.tokens -= tokens
+                self.granted += 1
+                return True
+            finally:
+                self._lock.release()
+        finally:
+            self.waiting -= 1
+
+    def mark_exhausted(self, retry_after: float):
+        """Upstream says the quota is spent: drain the bucket and block until retry_after elapses"""
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def seconds_until_available(self) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        return self._seconds_until_available(1.0, now)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "capacity": self.capacity,
+            "tokens": round(min(self.capacity, self.tokens + (time.monotonic() - self._updated) * self.rate), 2),
+            "blocked_for_seconds": round(max(self._blocked_until - time.monotonic(), 0.0), 1),
+            "waiting": self.waiting,
+            "granted": self.granted,
+            "rejected": self.rejected
+        }
+
+
+class RateLimitGovernor:
+    """Shared per-provider token buckets; providers without a configured limit are not throttled"""
+
+    def __init__(self, limits_per_minute: Dict[str, float], default_timeout: float = 1.0):
+        self.buckets = {provider: TokenBucket(rate) for provider, rate in limits_per_minute.items()}
+        self.default_timeout = default_timeout
+
+    async def acquire(self, provider: str, tokens: float = 1.0, timeout: Optional[float] = None):
+        """Wait for quota or raise QuotaExhausted so the caller can fall back immediately"""
+        bucket = self.buckets.get(provider)
+        if bucket is None:
+            return
+        if not await bucket.acquire(tokens, self.default_timeout if timeout is None else timeout):
+            raise QuotaExhausted(provider, bucket.seconds_until_available())
+
+    def mark_exhausted(self, provider: str, retry_after: float = 60.0):
+        bucket = self.buckets.get(provider)
+        if bucket is not None:
+            bucket.mark_exhausted(retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {provider: bucket.snapshot() for provider, bucket in self.buckets.items()}
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parse "provider=requests_per_minute,..." (e.g. "alpha_vantage=5,fmp=10")"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        provider, rate = item.split("=", 1)
+        limits[provider.strip()] = float(rate)
+    return limits
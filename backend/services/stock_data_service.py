@@ -3,13 +3,53 @@ Stock Data Service using multiple reliable APIs
 """
 import requests
 import json
+import os
+import time
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 import asyncio
 import httpx
+import numpy as np
+
+from services.ttl_cache import TTLCache, SingleFlight
+from services.provider_health import ProviderHealth
+from services.bar_store import BarStore
+from services.price_series import PriceSeries
+from services.synthetic_market_data import generate_gbm_series
+from services.rate_limiter import RateLimitGovernor, QuotaExhausted, parse_rate_limits
+
+# Alpha Vantage "compact" responses hold the latest 100 daily bars
+COMPACT_BAR_COUNT = 100
+DEFAULT_BAR_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ohlcv.sqlite3")
+
+# Free-tier request quotas per minute; override with STOCK_RATE_LIMITS="alpha_vantage=5,fmp=10,twelve_data=8"
+DEFAULT_RATE_LIMITS = "alpha_vantage=5,fmp=10,twelve_data=8"
+
+# Base prices for common stocks, used by the synthetic fallbacks
+SYNTHETIC_BASE_PRICES = {
+    "AAPL": 175.0,
+    "GOOGL": 130.0,
+    "MSFT": 310.0,
+    "TSLA": 250.0,
+    "AMZN": 140.0,
+    "NVDA": 450.0,
+    "META": 300.0,
+    "NFLX": 400.0,
+}
+
+try:
+    import h2  # noqa: F401 - only needed for HTTP/2 support in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 class StockDataService:
-    def __init__(self):
+    def __init__(self, http2: Optional[bool] = None, max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None, keepalive_expiry: Optional[float] = None,
+                 timeout: Optional[float] = None, quote_strategy: Optional[str] = None,
+                 hedge_delay: Optional[float] = None, quote_cache_ttl: Optional[float] = None,
+                 quote_cache_size: Optional[int] = None, bar_store_path: Optional[str] = None,
+                 batch_concurrency: Optional[int] = None):
         # These are free tier APIs that don't require authentication
         self.alpha_vantage_key = "demo"  # You can get a free key from https://www.alphavantage.co/
         self.base_urls = {
@@ -18,50 +58,480 @@ class StockDataService:
             "polygon": "https://api.polygon.io/v2",
             "marketstack": "http://api.marketstack.com/v1"
         }
+        
+        # Shared HTTP client settings - one pooled client is reused for every provider call
+        if http2 is None:
+            # "auto" enables HTTP/2 whenever the optional h2 dependency is installed
+            http2_setting = os.getenv("STOCK_HTTP2", "auto").lower()
+            http2 = HTTP2_AVAILABLE if http2_setting == "auto" else http2_setting == "true"
+        if http2 and not HTTP2_AVAILABLE:
+            print("[WARNING] HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("STOCK_HTTP_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv("STOCK_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=keepalive_expiry or float(os.getenv("STOCK_HTTP_KEEPALIVE_EXPIRY", "30"))
+        )
+        self.timeout = httpx.Timeout(timeout or float(os.getenv("STOCK_HTTP_TIMEOUT", "5.0")))
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight_requests = 0
+        self._total_requests = 0
+        
+        # Token buckets per provider; callers wait at most STOCK_QUOTA_MAX_WAIT seconds for quota
+        # before the fallback chain moves on to the next provider
+        self.rate_limiter = RateLimitGovernor(
+            parse_rate_limits(os.getenv("STOCK_RATE_LIMITS", DEFAULT_RATE_LIMITS)),
+            default_timeout=float(os.getenv("STOCK_QUOTA_MAX_WAIT", "1.0"))
+        )
+        
+        # Quote providers in priority order
+        self.quote_providers = [
+            ("alpha_vantage", self._get_alpha_vantage_quote),
+            ("fmp", self._get_fmp_quote),
+            ("twelve_data", self._get_twelve_data_quote)
+        ]
+        # "sequential" tries providers one after another, "hedged" starts the next provider
+        # after hedge_delay seconds without an answer, "parallel" fires every provider at once
+        self.quote_strategy = quote_strategy or os.getenv("STOCK_QUOTE_STRATEGY", "hedged")
+        self.hedge_delay = hedge_delay if hedge_delay is not None else float(os.getenv("STOCK_QUOTE_HEDGE_DELAY", "0.5"))
+        
+        # Short-lived quote cache keyed by (symbol, provider); concurrent misses share one upstream fetch
+        self.quote_cache = TTLCache(
+            max_entries=quote_cache_size or int(os.getenv("STOCK_QUOTE_CACHE_SIZE", "1024")),
+            ttl=quote_cache_ttl if quote_cache_ttl is not None else float(os.getenv("STOCK_QUOTE_CACHE_TTL", "15"))
+        )
+        self._quote_flights = SingleFlight()
+        
+        # Multi-symbol quotes: provider batch size and fan-out limit for providers without a batch endpoint
+        self.batch_chunk_size = int(os.getenv("STOCK_BATCH_CHUNK_SIZE", "50"))
+        self.batch_concurrency = batch_concurrency or int(os.getenv("STOCK_BATCH_CONCURRENCY", "10"))
+        
+        # Circuit breaker and latency tracking per upstream provider
+        self.provider_health = {
+            name: ProviderHealth(
+                name,
+                failure_threshold=float(os.getenv("STOCK_BREAKER_ERROR_RATE", "0.5")),
+                open_seconds=float(os.getenv("STOCK_BREAKER_OPEN_SECONDS", "30"))
+            )
+            for name in ["alpha_vantage", "fmp", "twelve_data", "alpha_vantage_historical"]
+        }
+        
+        # Local daily bar store; set STOCK_BAR_STORE_PATH to an empty string to disable it
+        if bar_store_path is None:
+            bar_store_path = os.getenv("STOCK_BAR_STORE_PATH", DEFAULT_BAR_STORE_PATH)
+        self.bar_store: Optional[BarStore] = None
+        if bar_store_path:
+            try:
+                self.bar_store = BarStore(bar_store_path)
+            except Exception as e:
+                print(f"[WARNING] Local bar store unavailable at {bar_store_path}: {e}")
+        self._historical_flights = SingleFlight()
+        self.bar_store_hits = 0
+        # Optional fixed seed for synthetic history (default: derived from the symbol)
+        synthetic_seed = os.getenv("STOCK_SYNTHETIC_SEED")
+        self.synthetic_seed: Optional[int] = int(synthetic_seed) if synthetic_seed else None
+        self.bar_store_refreshes = 0
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout
+            )
+        return self._client
+    
+    async def _http_get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                        provider: Optional[str] = None) -> httpx.Response:
+        """GET through the shared client, within the provider's rate limit, tracking in-flight requests"""
+        if provider:
+            await self.rate_limiter.acquire(provider)
+        
+        client = self._get_client()
+        self._in_flight_requests += 1
+        self._total_requests += 1
+        try:
+            response = await client.get(url, params=params)
+        finally:
+            self._in_flight_requests -= 1
+        
+        if provider and response.status_code == 429:
+            retry_after = response.headers.get("retry-after", "")
+            self._signal_quota_exhausted(provider, float(retry_after) if retry_after.isdigit() else 60.0)
+        # Server errors are outages (they count against the provider's breaker); 4xx answers are read as data
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+    
+    def _read_json(self, response: httpx.Response, provider: str) -> Any:
+        """Decode a provider response, turning in-band rate-limit messages into QuotaExhausted"""
+        data = response.json()
+        if isinstance(data, dict):
+            message = str(data.get("Note") or data.get("Information") or data.get("Error Message") or data.get("message") or "")
+            in_band_limit = data.get("code") == 429 or "Note" in data or any(
+                phrase in message.lower() for phrase in ("rate limit", "limit reach", "api credits", "requests per")
+            )
+            if in_band_limit:
+                self._signal_quota_exhausted(provider, 60.0)
+        return data
+    
+    def _signal_quota_exhausted(self, provider: str, retry_after: float):
+        self.rate_limiter.mark_exhausted(provider, retry_after)
+        raise QuotaExhausted(provider, retry_after)
+    
+    async def aclose(self):
+        """Close the shared HTTP client (called on application shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool statistics for sizing the shared client"""
+        stats = {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "open_connections": 0,
+            "idle_connections": 0,
+            "active_connections": 0,
+            "waiting_requests": 0,
+            "in_flight_requests": self._in_flight_requests,
+            "total_requests": self._total_requests
+        }
+        
+        # httpx does not expose pool state publicly, so read it from the underlying httpcore pool
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is None or self._client.is_closed:
+            return stats
+        
+        connections = list(getattr(pool, "connections", []))
+        stats["open_connections"] = len(connections)
+        stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        stats["active_connections"] = stats["open_connections"] - stats["idle_connections"]
+        
+        waiting = 0
+        for request in list(getattr(pool, "_requests", [])):
+            is_queued = getattr(request, "is_queued", None)
+            if is_queued is not None:
+                waiting += 1 if is_queued() else 0
+            elif getattr(request, "connection", None) is None:
+                waiting += 1
+        stats["waiting_requests"] = waiting
+        return stats
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Operational statistics for the stock data service"""
+        return {
+            "connection_pool": self.get_pool_stats(),
+            "bar_store": {
+                **(self.bar_store.stats() if self.bar_store else {"enabled": False}),
+                "hits": self.bar_store_hits,
+                "refreshes": self.bar_store_refreshes
+            },
+            "quote_cache": {**self.quote_cache.stats(), **self._quote_flights.stats()},
+            "rate_limits": self.rate_limiter.stats(),
+            "providers": {name: health.snapshot() for name, health in self.provider_health.items()}
+        }
     
     async def get_stock_quote(self, symbol: str) -> Dict[str, Any]:
         """Get current stock quote with fallback to multiple sources"""
         
-        # Method 1: Try Alpha Vantage (free tier)
-        try:
-            quote = await self._get_alpha_vantage_quote(symbol)
-            if quote:
-                return quote
-        except Exception as e:
-            print(f"Alpha Vantage failed: {e}")
+        cached = self._get_cached_quote(symbol)
+        if cached:
+            return cached
         
-        # Method 2: Try Financial Modeling Prep (free tier)
-        try:
-            quote = await self._get_fmp_quote(symbol)
-            if quote:
-                return quote
-        except Exception as e:
-            print(f"FMP failed: {e}")
+        quote = await self._quote_flights.do(symbol, lambda: self._fetch_stock_quote(symbol))
+        return dict(quote)
+    
+    async def get_stock_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get quotes for many symbols using provider batch endpoints, then bounded fan-out for the rest"""
+        symbols = list(dict.fromkeys(symbols))
+        quotes: Dict[str, Dict[str, Any]] = {}
         
-        # Method 3: Try Twelve Data (free tier)
-        try:
-            quote = await self._get_twelve_data_quote(symbol)
-            if quote:
-                return quote
-        except Exception as e:
-            print(f"Twelve Data failed: {e}")
+        for symbol in symbols:
+            cached = self._get_cached_quote(symbol)
+            if cached:
+                quotes[symbol] = cached
         
-        # Method 4: Generate synthetic data based on common patterns
+        # FMP accepts comma-separated symbols, so one request covers a whole chunk
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if missing and self.provider_health["fmp"].is_available():
+            fetch = self._track_provider("fmp", self._get_fmp_quotes_batch)
+            chunks = [missing[i:i + self.batch_chunk_size] for i in range(0, len(missing), self.batch_chunk_size)]
+            results = await asyncio.gather(*[fetch(chunk) for chunk in chunks], return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"FMP batch quote failed: {result}")
+                    continue
+                for symbol, quote in (result or {}).items():
+                    if self.quote_cache.ttl > 0:
+                        self.quote_cache.set((symbol, "fmp"), quote)
+                    quotes[symbol] = quote
+        
+        # Everything else goes through the single-symbol path with bounded concurrency
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        
+        async def fetch_one(symbol: str):
+            async with semaphore:
+                quotes[symbol] = await self.get_stock_quote(symbol)
+        
+        await asyncio.gather(*[fetch_one(symbol) for symbol in symbols if symbol not in quotes])
+        return {symbol: quotes[symbol] for symbol in symbols}
+    
+    def _get_cached_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached quote from the highest priority provider that has one"""
+        if self.quote_cache.ttl <= 0:
+            return None
+        # One hit or miss per symbol lookup, however many providers are checked
+        for name, _ in self.quote_providers:
+            if self.quote_cache.peek((symbol, name)):
+                return dict(self.quote_cache.get((symbol, name)))
+        self.quote_cache.record_miss()
+        return None
+    
+    async def _fetch_stock_quote(self, symbol: str) -> Dict[str, Any]:
+        """Fetch a quote from the upstream providers and cache it per provider"""
+        
+        providers = self._ordered_quote_providers()
+        if self.quote_strategy == "sequential":
+            quote = await self._get_quote_sequential(symbol, providers)
+        else:
+            delay = 0.0 if self.quote_strategy == "parallel" else self.hedge_delay
+            quote = await self._get_quote_hedged(symbol, providers, delay)
+        if quote:
+            if self.quote_cache.ttl > 0:
+                self.quote_cache.set((symbol, quote.get("source")), quote)
+            return quote
+        
+        # Last resort: Generate synthetic data based on common patterns
         return self._generate_synthetic_data(symbol)
     
+    def _ordered_quote_providers(self) -> List:
+        """Available providers, fastest healthy first; providers with an open breaker are skipped"""
+        ranked = []
+        for index, (name, fetch) in enumerate(self.quote_providers):
+            health = self.provider_health[name]
+            if not health.is_available():
+                continue
+            # Closed breakers before half-open probes, then by latency/error cost, then configured priority
+            rank = (health.state != "closed", health.expected_cost(), health.error_rate, index)
+            ranked.append((rank, name, fetch))
+        ranked.sort(key=lambda item: item[0])
+        return [(name, self._track_provider(name, fetch)) for _, name, fetch in ranked]
+    
+    def _track_provider(self, name: str, fetch):
+        """Wrap a provider call so its outcome and latency feed the provider's circuit breaker"""
+        health = self.provider_health[name]
+        
+        async def tracked(*args, **kwargs):
+            if not health.allow_request():
+                return None
+            started = time.monotonic()
+            try:
+                result = await fetch(*args, **kwargs)
+            except asyncio.CancelledError:
+                # Lost a hedged race - says nothing about the provider's health
+                health.release_probe()
+                raise
+            except QuotaExhausted as e:
+                # Out of quota is not an outage: skip straight to the next provider without tripping the breaker
+                health.release_probe()
+                print(f"{name} skipped: {e}")
+                return None
+            except Exception:
+                # Network errors, timeouts, HTTP 5xx and unreadable responses
+                health.record_failure(time.monotonic() - started)
+                raise
+            # An empty but well-formed answer (e.g. unknown symbol) still shows the provider is up
+            health.record_success(time.monotonic() - started)
+            return result
+        
+        return tracked
+    
+    async def _get_quote_sequential(self, symbol: str, providers: List) -> Optional[Dict[str, Any]]:
+        """Try each provider in order until one returns a quote"""
+        for name, fetch in providers:
+            try:
+                quote = await fetch(symbol)
+                if quote:
+                    return quote
+            except Exception as e:
+                print(f"{name} quote failed: {e}")
+        return None
+    
+    async def _get_quote_hedged(self, symbol: str, providers: List, delay: float) -> Optional[Dict[str, Any]]:
+        """Race providers: start the next one every `delay` seconds (or on failure) and keep the first valid quote"""
+        if not providers:
+            # Every breaker is open; the caller falls back to synthetic data
+            return None
+        pending = set()
+        remaining = list(providers)
+        task_names = {}
+        
+        def launch_next():
+            name, fetch = remaining.pop(0)
+            task = asyncio.ensure_future(fetch(symbol))
+            task_names[task] = name
+            pending.add(task)
+        
+        try:
+            launch_next()
+            while delay <= 0 and remaining:
+                launch_next()
+            
+            while pending:
+                # Wait for a result, but only up to the hedge delay while there are providers left to start
+                wait_timeout = delay if remaining else None
+                done, _ = await asyncio.wait(pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        quote = task.result()
+                        if quote:
+                            return quote
+                    except Exception as e:
+                        print(f"{task_names[task]} quote failed: {e}")
+                
+                # Hedge delay elapsed or a provider came back empty - bring in the next provider
+                if remaining:
+                    launch_next()
+            return None
+        finally:
+            # Cancel the slower providers once we have an answer
+            for task in pending:
+                task.cancel()
+    
     async def get_historical_data(self, symbol: str, days: int = 30) -> List[Dict[str, Any]]:
-        """Get historical stock data"""
+        """Get historical stock data (list of daily bars, newest first)"""
+        series = await self.get_price_series(symbol, days)
+        return series.to_records()
+    
+    async def get_price_series(self, symbol: str, days: int = 30, start_date: Optional[str] = None,
+                               end_date: Optional[str] = None) -> PriceSeries:
+        """Get historical stock data as a columnar PriceSeries (oldest to newest).
+        
+        Without a date range this returns the latest `days` bars; with start_date/end_date
+        (YYYY-MM-DD) it returns only the bars inside that range.
+        """
+        if start_date or end_date:
+            start_date, end_date = self._normalize_date_range(start_date, end_date, days)
+            if not np.busday_count(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1):
+                # A weekend/holiday-only range has no bars; don't synthesize one from outside it
+                return PriceSeries.empty(symbol)
+            # Provider responses always end today, so size the request by bars back to the range start
+            days = self._trading_days_between(start_date, date.today().isoformat())
+        
+        if self.bar_store is not None:
+            try:
+                series = await self._historical_flights.do(
+                    (symbol, days, start_date, end_date),
+                    lambda: self._get_stored_historical(symbol, days, start_date, end_date)
+                )
+                if len(series):
+                    return series
+            except Exception as e:
+                print(f"Local bar store failed: {e}")
+        else:
+            # Try Alpha Vantage first
+            try:
+                fetch = self._track_provider("alpha_vantage_historical", self._get_alpha_vantage_historical)
+                series = await fetch(symbol, days, self._outputsize_for(days))
+                if series and start_date:
+                    series = series.between(start_date, end_date)
+                if series:
+                    return series
+            except Exception as e:
+                print(f"Alpha Vantage historical failed: {e}")
+        
+        # Fallback to synthetic historical data
+        if start_date:
+            return generate_gbm_series(
+                symbol,
+                self._trading_days_between(start_date, end_date),
+                start_price=SYNTHETIC_BASE_PRICES.get(symbol, 100.0),
+                seed=self.synthetic_seed,
+                end=end_date
+            )
+        return self._generate_synthetic_historical(symbol, days)
+    
+    @staticmethod
+    def _normalize_date_range(start_date: Optional[str], end_date: Optional[str], days: int):
+        """Validate a YYYY-MM-DD range, defaulting missing bounds and clamping both bounds to today"""
+        today = date.today()
+        end = date.fromisoformat(end_date) if end_date else today
+        start = date.fromisoformat(start_date) if start_date else None
+        # Order the bounds before clamping, so a reversed future range can't keep a future end
+        if start is not None and start > end:
+            start, end = end, start
+        end = min(end, today)
+        if start is None:
+            start = np.busday_offset(np.datetime64(end, "D"), -(days - 1), roll="backward").astype(date)
+        return min(start, today).isoformat(), end.isoformat()
+    
+    @staticmethod
+    def _trading_days_between(start_date: str, end_date: str) -> int:
+        """Number of business days in the inclusive range"""
+        end = np.datetime64(end_date, "D") + np.timedelta64(1, "D")
+        return max(int(np.busday_count(np.datetime64(start_date, "D"), end)), 1)
+    
+    @staticmethod
+    def _outputsize_for(days: int) -> str:
+        return "compact" if days <= COMPACT_BAR_COUNT else "full"
+    
+    async def _get_stored_historical(self, symbol: str, days: int, start_date: Optional[str] = None,
+                                     end_date: Optional[str] = None) -> PriceSeries:
+        """Serve daily bars from the local store, fetching only the missing tail from the provider"""
+        store = self.bar_store
+        limit = None if start_date else days
+        series = await asyncio.to_thread(store.get_series, symbol, limit, start_date, end_date)
+        info = await asyncio.to_thread(store.refresh_info, symbol)
+        earliest_date, latest_date = await asyncio.to_thread(store.date_bounds, symbol)
+        
+        full_history = bool(info and info["full_history"])
+        refreshed_today = bool(info and info["refreshed_on"] == date.today().isoformat())
+        if start_date:
+            # A window ending before the latest stored bar is settled history and never needs a refresh
+            covers_start = earliest_date is not None and (earliest_date <= start_date or full_history)
+            covers_end = latest_date is not None and (latest_date >= end_date or refreshed_today)
+            is_covered = covers_start and covers_end
+        else:
+            is_covered = refreshed_today and (len(series) >= days or full_history)
+        if is_covered:
+            self.bar_store_hits += 1
+            return series
+        
+        # Compact covers the latest 100 bars - enough to close the gap unless the caller wants more
+        # history than we hold, or the store has been stale for longer than that
+        outputsize = "compact"
+        holds_enough = earliest_date is not None and (start_date is None and len(series) >= days
+                                                      or start_date is not None and earliest_date <= start_date)
+        if days > COMPACT_BAR_COUNT and not holds_enough and not full_history:
+            outputsize = "full"
+        elif latest_date and (datetime.now() - datetime.strptime(latest_date, "%Y-%m-%d")).days > COMPACT_BAR_COUNT:
+            outputsize = "full"
         
-        # Try Alpha Vantage first
         try:
-            data = await self._get_alpha_vantage_historical(symbol, days)
-            if data:
-                return data
+            fetch = self._track_provider("alpha_vantage_historical", self._get_alpha_vantage_historical)
+            fetched = await fetch(symbol, None, outputsize)
         except Exception as e:
             print(f"Alpha Vantage historical failed: {e}")
+            fetched = None
         
-        # Fallback to synthetic historical data
-        return self._generate_synthetic_historical(symbol, days)
+        if not fetched:
+            # Stale local history is still better than synthetic data
+            return series
+        
+        # Bars before the latest stored day never change; the latest one may have been a partial day
+        if latest_date is not None and outputsize != "full":
+            fetched = fetched.between(start=latest_date)
+        await asyncio.to_thread(store.upsert_series, symbol, fetched)
+        await asyncio.to_thread(store.mark_refreshed, symbol, outputsize == "full")
+        self.bar_store_refreshes += 1
+        return await asyncio.to_thread(store.get_series, symbol, limit, start_date, end_date)
     
     async def _get_alpha_vantage_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get quote from Alpha Vantage"""
@@ -72,51 +542,80 @@ class StockDataService:
             "apikey": self.alpha_vantage_key
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
-            
-            if "Global Quote" in data:
-                quote = data["Global Quote"]
-                return {
-                    "symbol": symbol,
-                    "current_price": float(quote.get("05. price", 0)),
-                    "change": float(quote.get("09. change", 0)),
-                    "change_percent": quote.get("10. change percent", "0%").replace("%", ""),
-                    "volume": int(quote.get("06. volume", 0)),
-                    "high": float(quote.get("03. high", 0)),
-                    "low": float(quote.get("04. low", 0)),
-                    "open": float(quote.get("02. open", 0)),
-                    "previous_close": float(quote.get("08. previous close", 0)),
-                    "source": "alpha_vantage"
-                }
+        response = await self._http_get(url, params=params, provider="alpha_vantage")
+        data = self._read_json(response, "alpha_vantage")
+        
+        if "Global Quote" in data:
+            quote = data["Global Quote"]
+            return {
+                "symbol": symbol,
+                "current_price": float(quote.get("05. price", 0)),
+                "change": float(quote.get("09. change", 0)),
+                "change_percent": quote.get("10. change percent", "0%").replace("%", ""),
+                "volume": int(quote.get("06. volume", 0)),
+                "high": float(quote.get("03. high", 0)),
+                "low": float(quote.get("04. low", 0)),
+                "open": float(quote.get("02. open", 0)),
+                "previous_close": float(quote.get("08. previous close", 0)),
+                "source": "alpha_vantage"
+            }
         return None
     
     async def _get_fmp_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get quote from Financial Modeling Prep (free tier)"""
         url = f"https://financialmodelingprep.com/api/v3/quote/{symbol}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            data = response.json()
-            
-            if data and len(data) > 0:
-                quote = data[0]
-                return {
-                    "symbol": symbol,
-                    "current_price": float(quote.get("price", 0)),
-                    "change": float(quote.get("change", 0)),
-                    "change_percent": str(quote.get("changesPercentage", 0)),
-                    "volume": int(quote.get("volume", 0)),
-                    "high": float(quote.get("dayHigh", 0)),
-                    "low": float(quote.get("dayLow", 0)),
-                    "open": float(quote.get("open", 0)),
-                    "previous_close": float(quote.get("previousClose", 0)),
-                    "market_cap": quote.get("marketCap"),
-                    "source": "fmp"
-                }
+        response = await self._http_get(url, provider="fmp")
+        data = self._read_json(response, "fmp")
+        
+        if data and len(data) > 0:
+            quote = data[0]
+            return {
+                "symbol": symbol,
+                "current_price": float(quote.get("price", 0)),
+                "change": float(quote.get("change", 0)),
+                "change_percent": str(quote.get("changesPercentage", 0)),
+                "volume": int(quote.get("volume", 0)),
+                "high": float(quote.get("dayHigh", 0)),
+                "low": float(quote.get("dayLow", 0)),
+                "open": float(quote.get("open", 0)),
+                "previous_close": float(quote.get("previousClose", 0)),
+                "market_cap": quote.get("marketCap"),
+                "source": "fmp"
+            }
         return None
     
+    async def _get_fmp_quotes_batch(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Get quotes for several symbols in one Financial Modeling Prep request"""
+        url = f"https://financialmodelingprep.com/api/v3/quote/{','.join(symbols)}"
+        
+        response = await self._http_get(url, provider="fmp")
+        data = self._read_json(response, "fmp")
+        
+        if not isinstance(data, list) or not data:
+            return None
+        
+        requested = set(symbols)
+        quotes = {}
+        for quote in data:
+            symbol = quote.get("symbol")
+            if symbol not in requested:
+                continue
+            quotes[symbol] = {
+                "symbol": symbol,
+                "current_price": float(quote.get("price", 0)),
+                "change": float(quote.get("change", 0)),
+                "change_percent": str(quote.get("changesPercentage", 0)),
+                "volume": int(quote.get("volume", 0)),
+                "high": float(quote.get("dayHigh", 0)),
+                "low": float(quote.get("dayLow", 0)),
+                "open": float(quote.get("open", 0)),
+                "previous_close": float(quote.get("previousClose", 0)),
+                "market_cap": quote.get("marketCap"),
+                "source": "fmp"
+            }
+        return quotes or None
+    
     async def _get_twelve_data_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get quote from Twelve Data (free tier)"""
         url = f"https://api.twelvedata.com/price"
@@ -125,83 +624,57 @@ class StockDataService:
             "apikey": "demo"  # Free tier
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
+        response = await self._http_get(url, params=params, provider="twelve_data")
+        data = self._read_json(response, "twelve_data")
+        
+        if "price" in data:
+            # Get additional data
+            quote_url = f"https://api.twelvedata.com/quote"
+            quote_params = {
+                "symbol": symbol,
+                "apikey": "demo"
+            }
             
-            if "price" in data:
-                # Get additional data
-                quote_url = f"https://api.twelvedata.com/quote"
-                quote_params = {
-                    "symbol": symbol,
-                    "apikey": "demo"
-                }
-                
-                quote_response = await client.get(quote_url, params=quote_params)
-                quote_data = quote_response.json()
-                
-                return {
-                    "symbol": symbol,
-                    "current_price": float(data.get("price", 0)),
-                    "change": float(quote_data.get("change", 0)),
-                    "change_percent": str(quote_data.get("percent_change", 0)),
-                    "volume": int(quote_data.get("volume", 0)),
-                    "high": float(quote_data.get("high", 0)),
-                    "low": float(quote_data.get("low", 0)),
-                    "open": float(quote_data.get("open", 0)),
-                    "previous_close": float(quote_data.get("previous_close", 0)),
-                    "source": "twelve_data"
-                }
+            quote_response = await self._http_get(quote_url, params=quote_params, provider="twelve_data")
+            quote_data = self._read_json(quote_response, "twelve_data")
+            
+            return {
+                "symbol": symbol,
+                "current_price": float(data.get("price", 0)),
+                "change": float(quote_data.get("change", 0)),
+                "change_percent": str(quote_data.get("percent_change", 0)),
+                "volume": int(quote_data.get("volume", 0)),
+                "high": float(quote_data.get("high", 0)),
+                "low": float(quote_data.get("low", 0)),
+                "open": float(quote_data.get("open", 0)),
+                "previous_close": float(quote_data.get("previous_close", 0)),
+                "source": "twelve_data"
+            }
         return None
     
-    async def _get_alpha_vantage_historical(self, symbol: str, days: int) -> Optional[List[Dict[str, Any]]]:
-        """Get historical data from Alpha Vantage"""
+    async def _get_alpha_vantage_historical(self, symbol: str, days: Optional[int],
+                                            outputsize: str = "compact") -> Optional[PriceSeries]:
+        """Get historical data from Alpha Vantage (all returned bars when days is None)"""
         url = f"{self.base_urls['alpha_vantage']}"
         params = {
             "function": "TIME_SERIES_DAILY",
             "symbol": symbol,
             "apikey": self.alpha_vantage_key,
-            "outputsize": "compact"
+            "outputsize": outputsize
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
-            
-            if "Time Series (Daily)" in data:
-                time_series = data["Time Series (Daily)"]
-                historical_data = []
-                
-                for date_str, values in list(time_series.items())[:days]:
-                    historical_data.append({
-                        "date": date_str,
-                        "open": float(values["1. open"]),
-                        "high": float(values["2. high"]),
-                        "low": float(values["3. low"]),
-                        "close": float(values["4. close"]),
-                        "volume": int(values["5. volume"])
-                    })
-                
-                return historical_data
+        response = await self._http_get(url, params=params, provider="alpha_vantage")
+        data = self._read_json(response, "alpha_vantage")
+        
+        if "Time Series (Daily)" in data:
+            return PriceSeries.from_alpha_vantage(symbol, data["Time Series (Daily)"], limit=days)
         return None
     
     def _generate_synthetic_data(self, symbol: str) -> Dict[str, Any]:
         """Generate realistic synthetic stock data for demo purposes"""
         import random
         
-        # Base prices for common stocks
-        base_prices = {
-            "AAPL": 175.0,
-            "GOOGL": 130.0,
-            "MSFT": 310.0,
-            "TSLA": 250.0,
-            "AMZN": 140.0,
-            "NVDA": 450.0,
-            "META": 300.0,
-            "NFLX": 400.0,
-        }
-        
-        base_price = base_prices.get(symbol, 100.0)
+        base_price = SYNTHETIC_BASE_PRICES.get(symbol, 100.0)
         
         # Add some random variation (+/- 5%)
         current_price = base_price * (1 + random.uniform(-0.05, 0.05))
@@ -222,27 +695,11 @@ class StockDataService:
             "source": "synthetic"
         }
     
-    def _generate_synthetic_historical(self, symbol: str, days: int) -> List[Dict[str, Any]]:
-        """Generate synthetic historical data"""
-        import random
-        from datetime import datetime, timedelta
-        
-        base_price = self._generate_synthetic_data(symbol)["current_price"]
-        historical_data = []
-        
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            # Simulate some price movement
-            price_variation = 1 + random.uniform(-0.03, 0.03)  # +/- 3% daily
-            price = base_price * price_variation
-            
-            historical_data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "open": round(price * random.uniform(0.99, 1.01), 2),
-                "high": round(price * random.uniform(1.00, 1.03), 2),
-                "low": round(price * random.uniform(0.97, 1.00), 2),
-                "close": round(price, 2),
-                "volume": random.randint(1000000, 50000000)
-            })
-        
-        return historical_data
\ No newline at end of file
+    def _generate_synthetic_historical(self, symbol: str, days: int) -> PriceSeries:
+        """Generate synthetic historical data (seeded GBM walk, deterministic per symbol)"""
+        return generate_gbm_series(
+            symbol,
+            days,
+            start_price=SYNTHETIC_BASE_PRICES.get(symbol, 100.0),
+            seed=self.synthetic_seed
+        )
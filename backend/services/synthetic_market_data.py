@@ -0,0 +1,101 @@
+"""
+Vectorized, seedable synthetic OHLCV generator (geometric Brownian motion)
+"""
+import zlib
+from datetime import date
+from typing import Optional, Union
+
+import numpy as np
+
+from services.price_series import PriceSeries
+
+TRADING_DAYS_PER_YEAR = 252
+MINUTES_PER_SESSION = 390  # 09:30 - 16:00
+SESSION_OPEN_MINUTE = 9 * 60 + 30
+
+INTERVALS = ("1d", "1min")
+VOLUME_PROFILES = ("flat", "u_shape")
+
+
+def symbol_seed(symbol: str) -> int:
+    """Stable per-symbol seed so the same ticker always produces the same path"""
+    return zlib.crc32(symbol.upper().encode("utf-8"))
+
+
+def _bar_timestamps(periods: int, interval: str, end: Optional[Union[str, date]]) -> np.ndarray:
+    """Business-day (or in-session minute) timestamps ending at `end`, oldest first"""
+    end_day = np.busday_offset(np.datetime64(end or date.today(), "D"), 0, roll="backward")
+
+    if interval == "1d":
+        return np.busday_offset(end_day, np.arange(-(periods - 1), 1), roll="backward")
+
+    sessions = -(-periods // MINUTES_PER_SESSION)  # ceil division
+    days = np.busday_offset(end_day, np.arange(-(sessions - 1), 1), roll="backward")
+    minute_of_day = np.arange(SESSION_OPEN_MINUTE, SESSION_OPEN_MINUTE + MINUTES_PER_SESSION)
+    stamps = days.astype("datetime64[m]")[:, None] + minute_of_day.astype("timedelta64[m]")
+    return stamps.ravel()[-periods:]
+
+
+def _volume_multiplier(periods: int, interval: str, profile: str) -> np.ndarray:
+    if profile == "flat" or interval == "1d":
+        return np.ones(periods)
+    # Heavier trading near the open and the close, quieter around midday
+    position = np.linspace(-1.0, 1.0, MINUTES_PER_SESSION)
+    session_curve = 0.5 + 1.5 * position ** 2
+    session_curve /= session_curve.mean()
+    sessions = -(-periods // MINUTES_PER_SESSION)
+    # Bars are the last `periods` minutes of whole sessions, so align the curve to the session close
+    return np.tile(session_curve, sessions)[-periods:]
+
+
+def generate_gbm_series(symbol: str, periods: int, start_price: float = 100.0, drift: float = 0.08,
+                        volatility: float = 0.25, interval: str = "1d", seed: Optional[int] = None,
+                        end: Optional[Union[str, date]] = None, base_volume: float = 20_000_000,
+                        volume_profile: str = "flat") -> PriceSeries:
+    """Generate `periods` OHLCV bars following a geometric Brownian motion.
+
+    drift and volatility are annualized; base_volume is the average volume per trading day and is
+    spread across the session for minute bars. The same seed (default: derived from the symbol)
+    always yields the same series.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}', expected one of {INTERVALS}")
+    if volume_profile not in VOLUME_PROFILES:
+        raise ValueError(f"Unsupported volume profile '{volume_profile}', expected one of {VOLUME_PROFILES}")
+    if periods <= 0:
+        return PriceSeries.empty(symbol, "synthetic")
+
+    rng = np.random.default_rng(symbol_seed(symbol) if seed is None else seed)
+    bars_per_year = TRADING_DAYS_PER_YEAR * (1 if interval == "1d" else MINUTES_PER_SESSION)
+    dt = 1.0 / bars_per_year
+    step_vol = volatility * np.sqrt(dt)
+
+    # Close-to-close log returns, then a small gap between each close and the next open
+    shocks = rng.standard_normal(periods)
+    log_returns = (drift - 0.5 * volatility ** 2) * dt + step_vol * shocks
+    close = start_price * np.exp(np.cumsum(log_returns))
+    previous_close = np.empty(periods)
+    previous_close[0] = start_price
+    previous_close[1:] = close[:-1]
+    open_ = previous_close * np.exp(0.25 * step_vol * rng.standard_normal(periods))
+
+    # Intrabar extremes extend beyond the open/close range
+    wick = np.abs(rng.standard_normal((2, periods))) * 0.5 * step_vol
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    # Lognormal volume, busier on large moves, shaped by the intraday profile
+    per_bar_volume = base_volume / (1 if interval == "1d" else MINUTES_PER_SESSION)
+    volume = per_bar_volume * rng.lognormal(-0.125, 0.5, periods) * (1 + np.abs(shocks)) / 1.8
+    volume *= _volume_multiplier(periods, interval, volume_profile)
+
+    return PriceSeries(
+        symbol,
+        _bar_timestamps(periods, interval, end),
+        np.round(open_, 2),
+        np.round(high, 2),
+        np.round(low, 2),
+        np.round(close, 2),
+        np.maximum(volume, 1).astype(np.int64),
+        source="synthetic"
+    )
@@ -0,0 +1,138 @@
+"""
+Token accounting per call site and per investigation, evidence trimming and adaptive max_tokens
+"""
+import contextvars
+import math
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+# Investigation the current task is working for; set by the agent so Claude usage can be attributed
+current_investigation: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_investigation", default=None
+)
+
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English prose/JSON (about 4 characters per token)"""
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN)) if text else 0
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, preferring a sentence or word boundary"""
+    limit = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < limit // 2:
+        boundary = cut.rfind(" ")
+    return (cut[:boundary + 1] if boundary > 0 else cut).rstrip() + " ..."
+
+
+class _CallSiteUsage:
+    def __init__(self, window: int):
+        self.calls = 0
+        self.cache_hits = 0
+        self.truncated = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.recent_outputs: Deque[int] = deque(maxlen=window)
+        self.recent_truncated: Deque[bool] = deque(maxlen=window)
+
+
+class TokenBudget:
+    """Observed token usage, used to trim prompts and size max_tokens from real output lengths"""
+
+    def __init__(self, adaptive: bool = True, min_samples: int = 20, headroom: float = 1.25,
+                 min_max_tokens: int = 256, window: int = 200, max_investigations: int = 1000):
+        self.adaptive = adaptive
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.min_max_tokens = min_max_tokens
+        self.window = window
+        self.max_investigations = max_investigations
+        self.call_sites: Dict[str, _CallSiteUsage] = {}
+        self.investigations: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+
+    def _site(self, call_site: str) -> _CallSiteUsage:
+        if call_site not in self.call_sites:
+            self.call_sites[call_site] = _CallSiteUsage(self.window)
+        return self.call_sites[call_site]
+
+    def record(self, call_site: str, input_tokens: int, output_tokens: int, truncated: bool = False):
+        """Record one completed request, attributed to the current investigation if one is set"""
+        site = self._site(call_site)
+        site.calls += 1
+        site.input_tokens += input_tokens
+        site.output_tokens += output_tokens
+        site.truncated += int(truncated)
+        site.recent_outputs.append(output_tokens)
+        site.recent_truncated.append(truncated)
+
+        investigation_id = current_investigation.get()
+        if investigation_id is None:
+            return
+        usage = self.investigations.pop(investigation_id, None) or {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens
+        usage["output_tokens"] += output_tokens
+        self.investigations[investigation_id] = usage
+        while len(self.investigations) > self.max_investigations:
+            self.investigations.popitem(last=False)
+
+    def record_cache_hit(self, call_site: str):
+        self._site(call_site).cache_hits += 1
+
+    def max_tokens_for(self, call_site: str, ceiling: int) -> int:
+        """max_tokens sized from the p95 of recent outputs plus headroom, never above the call site's ceiling.
+
+        Falls back to the ceiling until enough samples exist or when a recent response was truncated.
+        """
+        site = self.call_sites.get(call_site)
+        if not self.adaptive or site is None or len(site.recent_outputs) < self.min_samples:
+            return ceiling
+        if any(site.recent_truncated):
+            return ceiling
+        sized = np.percentile(np.fromiter(site.recent_outputs, dtype=float), 95) * self.headroom
+        # Round up to 128-token steps so the value (part of the response cache key) stays stable
+        sized = int(math.ceil(sized / 128.0)) * 128
+        return int(min(ceiling, max(self.min_max_tokens, sized)))
+
+    def fit_evidence(self, items: List[str], max_tokens: int, max_item_tokens: int = 150) -> List[str]:
+        """Keep evidence within max_tokens: shorten long items, then drop the ones that no longer fit"""
+        fitted = []
+        used = 0
+        for item in items:
+            item = trim_to_tokens(item, max_item_tokens)
+            cost = estimate_tokens(item)
+            if used + cost > max_tokens:
+                omitted = len(items) - len(fitted)
+                fitted.append(f"({omitted} further findings omitted for length)")
+                break
+            fitted.append(item)
+            used += cost
+        return fitted
+
+    def investigation_usage(self, investigation_id: str) -> Optional[Dict[str, int]]:
+        return self.investigations.get(investigation_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "adaptive_max_tokens": self.adaptive,
+            "call_sites": {
+                name: {
+                    "calls": site.calls,
+                    "cache_hits": site.cache_hits,
+                    "truncated": site.truncated,
+                    "input_tokens": site.input_tokens,
+                    "output_tokens": site.output_tokens,
+                    "avg_output_tokens": round(site.output_tokens / site.calls, 1) if site.calls else 0
+                }
+                for name, site in self.call_sites.items()
+            },
+            "tracked_investigations": len(self.investigations)
+        }
@@ -0,0 +1,50 @@
+import asyncio
+
+from agents.investigation_agent import InvestigationAgent
+
+
+class OfflineStockService:
+    async def get_stock_quote(self, symbol):
+        return {"current_price": 110.0}
+
+    async def get_price_series(self, *args, **kwargs):
+        raise ValueError("offline")
+
+
+def _agent(monkeypatch, tmp_path):
+    monkeypatch.setenv("INVESTIGATION_SPILL_PATH", str(tmp_path / "investigations.sqlite3"))
+    monkeypatch.delenv("INVESTIGATION_STATE_BACKEND", raising=False)
+    agent = InvestigationAgent(stock_service=OfflineStockService(), dedup=True)
+    agent.use_claude = False
+    return agent
+
+
+def test_identical_requests_share_one_run(monkeypatch, tmp_path):
+    agent = _agent(monkeypatch, tmp_path)
+
+    async def run():
+        first = await agent.start_investigation("tsla")
+        second = await agent.start_investigation("TSLA")
+        while (await agent.get_investigation_status(first))["status"] == "active":
+            await asyncio.sleep(0.01)
+        return first, second, await agent.get_investigation_status(second)
+
+    first, second, status = asyncio.run(run())
+    assert first != second and second not in agent.investigations
+    assert status["investigation_id"] == second
+    assert status["shared_investigation_id"] == first
+    assert status["status"] == "completed"
+
+
+def test_alias_resolves_after_leaving_memory(monkeypatch, tmp_path):
+    agent = _agent(monkeypatch, tmp_path)
+
+    async def run():
+        first = await agent.start_investigation("tsla")
+        second = await agent.start_investigation("tsla")
+        agent.investigations.flush()
+        agent._dedup_aliases.clear()
+        return first, second, await agent.get_investigation_status(second)
+
+    first, second, status = asyncio.run(run())
+    assert status.get("shared_investigation_id") == first
@@ -0,0 +1,67 @@
+import time
+
+from agents.investigation_store import InvestigationStore, SQLiteSnapshotBackend
+
+
+class State:
+    def __init__(self, investigation_id, status="active"):
+        self.investigation_id = investigation_id
+        self.status = status
+
+
+def serialize(state):
+    return {"investigation_id": state.investigation_id, "status": state.status}
+
+
+def test_least_recently_used_finished_investigations_are_spilled(tmp_path):
+    spill = SQLiteSnapshotBackend(str(tmp_path / "investigations.sqlite3"))
+    store = InvestigationStore(serialize, max_entries=2, spill=spill)
+
+    store["running"] = State("running")
+    for investigation_id in ("a", "b"):
+        store[investigation_id] = State(investigation_id, "completed")
+        store.mark_finished(investigation_id)
+    store.flush()
+
+    # "running" is older but still active, so the oldest finished one goes
+    assert "running" in store
+    assert "a" not in store and "b" in store
+    assert store.load_snapshot("a") == {"investigation_id": "a", "status": "completed"}
+    assert store.stats()["evictions"] == 1 and store.stats()["spilled"] == 1
+
+
+def test_evicted_investigation_is_served_before_its_spill_is_written(tmp_path):
+    spill = SQLiteSnapshotBackend(str(tmp_path / "investigations.sqlite3"))
+    store = InvestigationStore(serialize, max_entries=1, spill=spill)
+    store["a"] = State("a", "completed")
+    store.mark_finished("a")
+    store["b"] = State("b", "completed")
+    store.mark_finished("b")
+
+    assert store.load_snapshot("a")["status"] == "completed"
+    store.flush()
+    assert spill.load("a")["status"] == "completed"
+
+
+def test_finished_investigations_expire_after_the_ttl():
+    store = InvestigationStore(serialize, completed_ttl=0.05)
+    store["a"] = State("a", "completed")
+    store["b"] = State("b")
+    store.mark_finished("a")
+    time.sleep(0.1)
+
+    assert "a" not in store and "b" in store
+    assert store.stats()["expirations"] == 1
+    assert store.load_snapshot("a") is None
+
+
+def test_byte_limit_evicts_once_sizes_are_measured():
+    store = InvestigationStore(serialize, max_bytes=100)
+    for investigation_id in ("a", "b", "c"):
+        store[investigation_id] = State(investigation_id, "completed")
+        store.mark_finished(investigation_id)
+    store.flush()
+    store["d"] = State("d")
+
+    assert store.stats()["finished_bytes"] <= 100
+    assert "c" in store and "d" in store and "a" not in store
@@ -0,0 +1,16 @@
+from services.json_extract import extract_json_object, parse_partial_json
+
+
+def test_extracts_object_from_prose_and_fences():
+    assert extract_json_object('Here you go:\n```json\n{"a": {"b": "x\ny"}}\n```') == {"a": {"b": "x\ny"}}
+
+
+def test_partial_object_keeps_complete_members():
+    assert parse_partial_json('{"a": 1, "b": [1, 2, {"c": "x"') == {"a": 1, "b": [1, 2, {}]}
+    assert parse_partial_json('{"summary": "cut off mid sent') == {"summary": "cut off mid sent"}
+
+
+def test_deeply_nested_input_returns_none():
+    for text in ('{"a":' * 2000, "{" * 20000):
+        assert extract_json_object(text) is None
+        assert parse_partial_json(text) is None
@@ -0,0 +1,53 @@
+import asyncio
+import types
+
+import pytest
+
+from services.llm_batch import BatchBackend, BatchDispatcher, LocalBatchBackend
+
+
+def _message(text):
+    return types.SimpleNamespace(content=[types.SimpleNamespace(text=text)])
+
+
+def test_concurrent_requests_share_one_batch():
+    async def create_message(**params):
+        if params["messages"][0]["content"] == "fail":
+            raise ValueError("bad request")
+        return _message(params["messages"][0]["content"].upper())
+
+    async def run():
+        dispatcher = BatchDispatcher(LocalBatchBackend(create_message), flush_interval=0.05, poll_interval=0.01)
+        prompts = ["a", "b", "fail", "c"]
+        results = await asyncio.gather(
+            *[dispatcher.complete({"messages": [{"role": "user", "content": p}]}) for p in prompts],
+            return_exceptions=True
+        )
+        return dispatcher, results
+
+    dispatcher, results = asyncio.run(run())
+    assert results[:2] == ["A", "B"] and results[3] == "C"
+    assert isinstance(results[2], RuntimeError) and "bad request" in str(results[2])
+    assert dispatcher.stats()["batches_submitted"] == 1
+    assert dispatcher.stats()["requests_submitted"] == 4
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_interval():
+    async def create_message(**params):
+        return _message("ok")
+
+    async def run():
+        dispatcher = BatchDispatcher(LocalBatchBackend(create_message), max_batch_size=2,
+                                     flush_interval=60, poll_interval=0.01)
+        params = {"messages": [{"role": "user", "content": "x"}]}
+        results = await asyncio.wait_for(asyncio.gather(dispatcher.complete(params), dispatcher.complete(params)), 5)
+        return dispatcher, results
+
+    dispatcher, results = asyncio.run(run())
+    assert results == ["ok", "ok"]
+    assert dispatcher.stats()["batches_submitted"] == 1
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        BatchBackend()
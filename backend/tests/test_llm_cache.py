@@ -0,0 +1,19 @@
+import asyncio
+import sqlite3
+
+from services.llm_cache import LLMResponseCache
+
+
+def test_sqlite_tier_is_capped_at_max_rows(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    cache = LLMResponseCache(max_entries=1, ttl=900.0, sqlite_path=path, max_rows=3)
+
+    async def fill():
+        for index in range(10):
+            await cache.set(f"key{index}", f"value{index}")
+
+    asyncio.run(fill())
+
+    keys = {row[0] for row in sqlite3.connect(path).execute("SELECT key FROM llm_responses")}
+    assert keys == {"key7", "key8", "key9"}
+    assert asyncio.run(cache.get("key8")) == "value8"
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from services.stock_data_service import StockDataService
+
+
+@pytest.fixture
+def service():
+    service = StockDataService(bar_store_path="", quote_cache_ttl=0)
+    calls = []
+
+    async def provider(symbol):
+        calls.append(symbol)
+        return {"symbol": symbol, "current_price": 123.0, "source": "fmp"}
+
+    service.quote_providers = [(name, provider) for name in ("alpha_vantage", "fmp", "twelve_data")]
+    service.provider_calls = calls
+    return service
+
+
+@pytest.mark.parametrize("strategy", ["hedged", "parallel", "sequential"])
+def test_all_breakers_open_falls_back_to_synthetic_quote(service, strategy):
+    service.quote_strategy = strategy
+    for health in service.provider_health.values():
+        health._trip()
+
+    quote = asyncio.run(service.get_stock_quote("AAPL"))
+
+    assert quote["symbol"] == "AAPL"
+    assert quote.get("source") != "fmp"
+    assert service.provider_calls == []
+
+
+def test_batch_quotes_with_all_breakers_open(service):
+    for health in service.provider_health.values():
+        health._trip()
+
+    quotes = asyncio.run(service.get_stock_quotes(["AAPL", "MSFT"]))
+
+    assert set(quotes) == {"AAPL", "MSFT"}
+    assert service.provider_calls == []
+
+
+def test_unknown_symbols_do_not_open_breakers(service):
+    async def not_found(symbol):
+        return None
+
+    service.quote_strategy = "sequential"
+    service.quote_providers = [(name, not_found) for name, _ in service.quote_providers]
+
+    async def run():
+        for symbol in ("BAD1", "BAD2", "BAD3", "BAD4", "BAD5"):
+            await service.get_stock_quote(symbol)
+
+    asyncio.run(run())
+    assert all(service.provider_health[name].state == "closed" for name, _ in service.quote_providers)
+
+
+def test_provider_errors_open_the_breaker(service):
+    async def outage(symbol):
+        raise ConnectionError("upstream down")
+
+    service.quote_strategy = "sequential"
+    service.quote_providers = [(name, outage) for name, _ in service.quote_providers]
+
+    async def run():
+        for _ in range(4):
+            await service.get_stock_quote("AAPL")
+
+    asyncio.run(run())
+    assert all(service.provider_health[name].state == "open" for name, _ in service.quote_providers)
+
+
+def test_range_without_trading_days_returns_no_bars(service):
+    series = asyncio.run(service.get_price_series("AAPL", start_date="2026-10-10", end_date="2026-10-11"))
+
+    assert len(series) == 0